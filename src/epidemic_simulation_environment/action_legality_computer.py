@@ -0,0 +1,185 @@
+import numpy as np
+
+# Actions associated with each of the five "isolated" actions (No NPM/PM, SDM, Lockdown, Mask Mandate, Vaccination
+# Mandate).
+action_association_list = [
+    [0],
+    [1, 5, 6, 10],
+    [2, 7, 8, 11],
+    [3, 5, 7, 9, 10, 11],
+    [4, 6, 8, 9, 10, 11],
+]
+
+# Minimum and maximum number of consecutive timesteps of the five isolated actions.
+minimum_action_periods = [14, 28, 14, 28, 0]
+maximum_action_periods = [56, 112, 42, 180, 0]
+
+
+class ActionLegalityComputer:
+    """This class computes which actions are allowed and required given the action counters.
+
+    The allowed and required actions only depend on which of the 5 minimum-period and 5 maximum-period rules would be
+    violated, so the rules are compiled once into tables indexed by the 10-bit violation code. The masks of any number
+    of states are then looked up with a single gather."""
+
+    def __init__(self, min_periods, max_periods, number_of_actions=12):
+        """This method initializes the lookup tables.
+
+        :param min_periods: List of the minimum periods of the five isolated actions.
+        :param max_periods: List of the maximum periods of the five isolated actions.
+        :param number_of_actions: Integer - Size of the discrete action space."""
+
+        self.min_periods = np.asarray(min_periods)
+        self.max_periods = np.asarray(max_periods)
+        self.number_of_actions = number_of_actions
+
+        # Bit i of the violation code is the minimum period violation of action i and bit 5 + i the maximum period
+        # violation.
+        self.min_period_violation_bits = 2 ** np.arange(5)
+        self.max_period_violation_bits = 2 ** np.arange(5, 10)
+
+        self.allowed_actions_table = np.zeros((1024, 5), dtype=bool)
+        self.required_actions_table = np.zeros((1024, 5), dtype=bool)
+        self.allowed_actions_numbers_table = np.zeros(
+            (1024, number_of_actions), dtype=int
+        )
+        for violation_code in range(1024):
+            min_period_violations = [
+                bool(violation_code & bit) for bit in self.min_period_violation_bits
+            ]
+            max_period_violations = [
+                bool(violation_code & bit) for bit in self.max_period_violation_bits
+            ]
+            (
+                self.allowed_actions_table[violation_code],
+                self.required_actions_table[violation_code],
+                self.allowed_actions_numbers_table[violation_code],
+            ) = self.compute_action_legality(
+                min_period_violations, max_period_violations, number_of_actions
+            )
+
+    def __call__(self, action_counters):
+        """This method looks up the allowed and required actions.
+
+        :param action_counters: Array (..., 5) - Consecutive timesteps for which each isolated action was taken.
+
+        :returns allowed_actions: Array (..., 5) - Booleans indicating which isolated actions are allowed.
+                 required_actions: Array (..., 5) - Booleans indicating which isolated actions are required.
+                 allowed_actions_numbers: Array (..., number_of_actions) - 1 for the allowed action numbers, else 0.
+        """
+
+        violation_codes = self.violation_codes(action_counters)
+
+        return (
+            self.allowed_actions_table[violation_codes],
+            self.required_actions_table[violation_codes],
+            self.allowed_actions_numbers_table[violation_codes],
+        )
+
+    def violation_codes(self, action_counters):
+        """This method encodes the potential violations of the action counters as 10-bit codes.
+
+        :param action_counters: Array (..., 5) - Consecutive timesteps for which each isolated action was taken.
+        """
+
+        # Potential Violations (If the action is not taken in the next time-step.):
+        min_period_violations = (0 < action_counters) & (
+            action_counters < self.min_periods
+        )
+        # Potential Violations (If the action is taken in the next time-step.):
+        max_period_violations = action_counters >= self.max_periods
+
+        return min_period_violations @ self.min_period_violation_bits + (
+            max_period_violations @ self.max_period_violation_bits
+        )
+
+    @staticmethod
+    def compute_action_legality(
+        min_period_violations, max_period_violations, number_of_actions
+    ):
+        """This method computes the allowed and required actions for one combination of potential violations.
+
+        :param min_period_violations: List of 5 booleans - Minimum period violations of the isolated actions.
+        :param max_period_violations: List of 5 booleans - Maximum period violations of the isolated actions.
+        :param number_of_actions: Integer - Size of the discrete action space."""
+
+        (
+            no_npm_pm_min_period_violation,
+            sdm_min_period_violation,
+            lockdown_min_period_violation,
+            mask_mandate_min_period_violation,
+            vaccination_mandate_min_period_violation,
+        ) = min_period_violations
+        (
+            no_npm_pm_max_period_violation,
+            sdm_max_period_violation,
+            lockdown_max_period_violation,
+            mask_mandate_max_period_violation,
+            vaccination_mandate_max_period_violation,
+        ) = max_period_violations
+
+        # Required Actions (As in not taking them will result in minimum violation):
+        required_actions = list(min_period_violations)
+
+        # Allowed Actions
+        allowed_actions = [
+            (not sdm_min_period_violation)
+            and (not lockdown_min_period_violation)
+            and (not mask_mandate_min_period_violation)
+            and (not vaccination_mandate_min_period_violation)
+            and (not no_npm_pm_max_period_violation),
+            (not no_npm_pm_min_period_violation)
+            and (not lockdown_min_period_violation)
+            and (not sdm_max_period_violation),
+            (not no_npm_pm_min_period_violation)
+            and (not sdm_min_period_violation)
+            and (not lockdown_max_period_violation),
+            (not no_npm_pm_min_period_violation)
+            and (not mask_mandate_max_period_violation),
+            (not no_npm_pm_min_period_violation)
+            and (not vaccination_mandate_max_period_violation),
+        ]
+
+        actions_allowed = None
+
+        # First we simply go through the required actions and find the set of associated actions. This can lead to a
+        # situation in which for e.g., the mask mandate action is required but not all other actions in the action
+        # association list such as lockdown are allowed are included. We remove them with the next for loop.
+        for i in range(5):
+            if required_actions[i]:
+                if actions_allowed is None:
+                    actions_allowed = set(action_association_list[i])
+                else:
+                    # Set intersection operator.
+                    actions_allowed = actions_allowed & set(action_association_list[i])
+
+        # Here we check if the "actions_allowed" set contains any actions that are in fact not allowed
+        # (and not required). We remove such actions from the set with by taking a difference between the sets.
+        for i in range(5):
+            if not allowed_actions[i] and not required_actions[i]:
+                if actions_allowed is None:
+                    break
+                else:
+                    actions_allowed = actions_allowed.difference(
+                        set(action_association_list[i])
+                    )
+
+        # Exception case.
+        if actions_allowed is None:
+            actions_allowed = set()
+            for i in range(5):
+                if allowed_actions[i]:
+                    actions_allowed = actions_allowed.union(
+                        set(action_association_list[i])
+                    )
+            for i in range(5):
+                if not allowed_actions[i]:
+                    actions_allowed = actions_allowed.difference(
+                        set(action_association_list[i])
+                    )
+
+        allowed_actions_numbers = [
+            1 if i in actions_allowed else 0 for i in range(number_of_actions)
+        ]
+
+        return allowed_actions, required_actions, allowed_actions_numbers
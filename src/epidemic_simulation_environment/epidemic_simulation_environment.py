@@ -6,7 +6,18 @@ import numpy as np
 import pandas as pd
 from src.settings import data_directory
 from src.utilities.parameter_initializer import ParameterInitializer
-from population_dynamics_computer import PopulationDynamicsComputer
+from population_dynamics_computer import epidemiological_model_parameter_names
+from src.epidemic_simulation_environment.population_dynamics_store import (
+    PopulationDynamicsStore,
+)
+from src.epidemic_simulation_environment.action_legality_computer import (
+    minimum_action_periods,
+    maximum_action_periods,
+)
+from src.epidemic_simulation_environment.simulation_step_computer import (
+    initialize_simulation,
+)
+from src.utilities.step_telemetry import StepTelemetry
 
 pd.set_option("display.max_columns", 50)
 
@@ -23,6 +34,7 @@ class EpidemicSimulationMA(gym.Env):
         """
 
         self.environment_config = env_config
+        self.telemetry = StepTelemetry(enabled=env_config.get("telemetry", False))
         self.observation_space = spaces.Box(low=0, high=11, shape=(4,))
         self.action_space = spaces.Discrete(12)
 
@@ -39,16 +51,6 @@ class EpidemicSimulationMA(gym.Env):
         )
         # print("Epidemiological Model Data:\n", self.epidemiological_model_data)
 
-        self.population_dynamics_dataframes = (
-            self.parameter_initializer.initialize_population_dynamics()
-        )
-        # print("\nPopulation Dynamics:\n", self.population_dynamics_dataframes)
-
-        self.epidemiological_model_parameters = (
-            self.parameter_initializer.initialize_epidemiological_model_parameters()
-        )
-        # print("\nEpidemiological Model Parameters:\n", self.epidemiological_model_parameters)
-
         self.state_populations = (
             self.parameter_initializer.initialize_state_populations()
         )
@@ -62,11 +64,7 @@ class EpidemicSimulationMA(gym.Env):
             self.allowed_actions,
             self.required_actions,
             self.allowed_actions_numbers,
-            self.no_npm_pm_counters,
-            self.sdm_counters,
-            self.lockdown_counters,
-            self.mask_mandate_counters,
-            self.vaccination_mandate_counters,
+            self.action_counters,
         ) = self.parameter_initializer.initialize_action_dynamics(
             action_space=self.action_space
         )
@@ -78,8 +76,7 @@ class EpidemicSimulationMA(gym.Env):
         # print("\nRequired Actions:\n", self.required_actions)
         # print("\nAllowed Action Numbers:\n", self.allowed_actions_numbers)
 
-        # print("\nAction Counters:\n", self.no_npm_pm_counter, self.sdm_counter, self.lockdown_counter,
-        #       self.mask_mandate_counter, self.vaccination_mandate_counter)
+        # print("\nAction Counters:\n", self.action_counters)
 
         # Hyperparameters for reward function.
         self.economic_and_social_rate_lower_limit = 70
@@ -91,23 +88,62 @@ class EpidemicSimulationMA(gym.Env):
         self.max_timesteps = 181
         self.timestep = 0
 
-        self.min_no_npm_pm_period = 14
-        self.min_sdm_period = 28
-        self.min_lockdown_period = 14
-        self.min_mask_mandate_period = 28
-        self.min_vaccination_mandate_period = 0
+        # The episode ends with the step taken at the maximum timestep, which appends one more row.
+        self.population_dynamics = PopulationDynamicsStore(
+            states=self.states,
+            max_timesteps=self.max_timesteps + 1,
+            simulation_start_date=env_config["simulation_start_date"],
+        )
+        self.population_dynamics.initialize_rows(
+            self.parameter_initializer.initialize_initial_population_dynamics(
+                states=self.states, columns=self.population_dynamics.columns
+            )
+        )
+        # print("\nPopulation Dynamics:\n", self.population_dynamics.to_dataframes())
 
-        self.max_no_npm_pm_period = 56
-        self.max_sdm_period = 112
-        self.max_lockdown_period = 42
-        self.max_mask_mandate_period = 180
-        self.max_vaccination_mandate_period = 0
+        (
+            self.min_no_npm_pm_period,
+            self.min_sdm_period,
+            self.min_lockdown_period,
+            self.min_mask_mandate_period,
+            self.min_vaccination_mandate_period,
+        ) = minimum_action_periods
+        (
+            self.max_no_npm_pm_period,
+            self.max_sdm_period,
+            self.max_lockdown_period,
+            self.max_mask_mandate_period,
+            self.max_vaccination_mandate_period,
+        ) = maximum_action_periods
 
         self.new_cases = {}
         for state in self.states:
             self.new_cases[state] = []
 
-        self.population_dynamics_computer = PopulationDynamicsComputer()
+        # Read-only arrays (in the order of self.states) and computers used by the vectorized steps, shared by every
+        # environment.
+        (
+            epidemiological_model_arrays,
+            self.action_effects,
+            self.action_legality_computer,
+            self.simulation_step_computer,
+        ) = initialize_simulation(
+            parameter_initializer=self.parameter_initializer,
+            states=self.states,
+            env_config=env_config,
+            number_of_actions=self.action_space.n,
+        )
+        self.state_population_values = epidemiological_model_arrays["state_populations"]
+        self.state_indices = np.arange(len(self.states))
+
+        # The noisy model parameters of the current split (states x parameters) are perturbed further at every step
+        # of the split, starting from the baselines.
+        self.episode_model_parameter_values = np.zeros(
+            (len(self.states), len(epidemiological_model_parameter_names))
+        )
+        self.episode_model_parameter_splits = np.full(len(self.states), -1)
+
+        self.draw_episode_noise()
 
     def reset(
         self,
@@ -117,11 +153,20 @@ class EpidemicSimulationMA(gym.Env):
     ):
         """This method resets the environment and returns the state as the observation.
 
+        :param seed: Integer seeding the random number generator of the environment.
+        :param options: Not used.
+
         :returns observation: - (Vector containing the normalized count of number of healthy people, infected people
                                 and hospitalized people.)"""
 
-        self.population_dynamics_dataframes = (
-            self.parameter_initializer.initialize_population_dynamics()
+        super().reset(seed=seed)
+        self.episode_model_parameter_splits = np.full(len(self.states), -1)
+        self.draw_episode_noise()
+
+        self.population_dynamics.initialize_rows(
+            self.parameter_initializer.initialize_initial_population_dynamics(
+                states=self.states, columns=self.population_dynamics.columns
+            )
         )
 
         self.new_cases = {}
@@ -138,11 +183,7 @@ class EpidemicSimulationMA(gym.Env):
             self.allowed_actions,
             self.required_actions,
             self.allowed_actions_numbers,
-            self.no_npm_pm_counters,
-            self.sdm_counters,
-            self.lockdown_counters,
-            self.mask_mandate_counters,
-            self.vaccination_mandate_counters,
+            self.action_counters,
         ) = self.parameter_initializer.initialize_action_dynamics(
             action_space=self.action_space
         )
@@ -150,9 +191,9 @@ class EpidemicSimulationMA(gym.Env):
         observations = {}
         for state in self.epidemiological_model_data:
             state_observation = [
-                self.population_dynamics_dataframes[state]["Infected"].iloc[-1]
+                self.population_dynamics[state]["Infected"].iloc[-1]
                 / self.state_populations[state],
-                self.population_dynamics_dataframes[state][
+                self.population_dynamics[state][
                     "Economic and Public Perception Rate"
                 ].iloc[-1],
                 self.previous_actions[state],
@@ -164,11 +205,25 @@ class EpidemicSimulationMA(gym.Env):
 
         return observations, info
 
+    def draw_episode_noise(self):
+        """This method draws the standard normal noise of the exposure rates and model parameters for every timestep
+        of the episode at once (timesteps x states x (1 + parameters), beta first) from the random number generator of
+        the environment."""
+
+        self.episode_noise = self.np_random.standard_normal(
+            (
+                self.max_timesteps + 1,
+                len(self.states),
+                1 + len(epidemiological_model_parameter_names),
+            )
+        )
+
     def step(self, actions):
         """This method implements what happens when the agent takes a particular action. It changes the rate at which
         new people are infected, defines the rewards for the various states, and determines when the episode ends.
 
-        :param actions: - Dictionary ....
+        :param actions: - Array containing the action of every state (in the order of self.states). A dictionary
+                          mapping the state names to their actions is also accepted.
 
         :returns observation: - (Vector containing the normalized count of number of healthy people, infected people
                                 and hospitalized people.)
@@ -177,482 +232,84 @@ class EpidemicSimulationMA(gym.Env):
                  info: - (A dictionary that can be used to provide additional implementation information.)
         """
 
+        telemetry = self.telemetry
+
         observations = {}
         rewards = {}
         truncations = {}
         terminations = {}
         infos = {}
 
-        for state in self.states:
-            print("State:", state)
-            self.action_histories[state].append(actions[state])
-
-            if len(self.action_histories[state]) == 1:
-                self.previous_actions[state] = 0
-            else:
-                self.previous_actions[state] = self.action_histories[state][-2]
-            self.current_actions[state] = actions[state]
-
-            # This index helps to use the different parameter values for the different splits.
-            # AD: Converts range(n) into [7 (10x), 8 (28x), 9 (28x), 10 (28x), ...]
-            #     28 = 4 weeks. 214 = start date (october)
-            index = int(np.floor((self.timestep + 214) / 28))
-
-            # Updating the action dependent parameters:
-            # Switch from a discrete action space to a multi-discrete action space.
-            beta = None
-            economic_and_public_perception_rate = None
-            if actions[state] == 0:  # No NPM or PM taken. 7.3
-                beta = (
-                    self.epidemiological_model_parameters[state]["beta"][index] * 1.4
-                    if self.population_dynamics_dataframes[state]["Infected"].iloc[-1]
-                    / self.state_populations[state]
-                    >= 0.001
-                    else self.epidemiological_model_parameters[state]["beta"][index]
-                    * 1.1
-                )
+        if isinstance(actions, dict):
+            actions = [actions[state] for state in self.states]
+        actions = np.asarray(actions, dtype=int)
 
-                economic_and_public_perception_rate = (
-                    min(
-                        1.005
-                        * self.population_dynamics_dataframes[state][
-                            "Economic and Public Perception Rate"
-                        ].iloc[-1],
-                        100,
-                    )
-                    if self.population_dynamics_dataframes[state]["Infected"].iloc[-1]
-                    / self.state_populations[state]
-                    < 0.001
-                    else 0.999
-                    * self.population_dynamics_dataframes[state][
-                        "Economic and Public Perception Rate"
-                    ].iloc[-1]
-                )
-                self.no_npm_pm_counters[state] += 1
-                self.sdm_counters[state] = 0
-                self.lockdown_counters[state] = 0
-                self.mask_mandate_counters[state] = 0
-                self.vaccination_mandate_counters[state] = 0
-
-            elif actions[state] == 1:  # SDM
-                beta = (
-                    self.epidemiological_model_parameters[state]["beta"][index] * 0.95
-                )
-                economic_and_public_perception_rate = (
-                    self.population_dynamics_dataframes[state][
-                        "Economic and Public Perception Rate"
-                    ].iloc[-1]
-                    * 0.9965
-                )
-                self.no_npm_pm_counters[state] = 0
-                self.sdm_counters[state] += 1
-                self.lockdown_counters[state] = 0
-                self.mask_mandate_counters[state] = 0
-                self.vaccination_mandate_counters[state] = 0
-
-            elif (
-                actions[state] == 2
-            ):  # Lockdown (Closure of non-essential business, schools, gyms...) 0.997
-                beta = (
-                    self.epidemiological_model_parameters[state]["beta"][index] * 0.85
-                )
-                economic_and_public_perception_rate = (
-                    self.population_dynamics_dataframes[state][
-                        "Economic and Public Perception Rate"
-                    ].iloc[-1]
-                    * 0.997
-                )
-                self.no_npm_pm_counters[state] = 0
-                self.sdm_counters[state] = 0
-                self.lockdown_counters[state] += 1
-                self.mask_mandate_counters[state] = 0
-                self.vaccination_mandate_counters[state] = 0
-
-            elif actions[state] == 3:  # Public Mask Mandates 0.9975
-                beta = (
-                    self.epidemiological_model_parameters[state]["beta"][index] * 0.925
-                )
-                economic_and_public_perception_rate = (
-                    self.population_dynamics_dataframes[state][
-                        "Economic and Public Perception Rate"
-                    ].iloc[-1]
-                    * 0.9965
-                )
-                self.no_npm_pm_counters[state] = 0
-                self.sdm_counters[state] = 0
-                self.lockdown_counters[state] = 0
-                self.mask_mandate_counters[state] += 1
-                self.vaccination_mandate_counters[state] = 0
-
-            elif actions[state] == 4:  # Vaccination Mandates 0.994
-                beta = (
-                    self.epidemiological_model_parameters[state]["beta"][index] * 0.95
-                )
-                economic_and_public_perception_rate = (
-                    self.population_dynamics_dataframes[state][
-                        "Economic and Public Perception Rate"
-                    ].iloc[-1]
-                    * 0.994
-                )
-                self.no_npm_pm_counters[state] = 0
-                self.sdm_counters[state] = 0
-                self.lockdown_counters[state] = 0
-                self.mask_mandate_counters[state] = 0
-                self.vaccination_mandate_counters[state] += 1
-
-            elif actions[state] == 5:  # SDM and Public Mask Mandates 0.9965
-                beta = (
-                    self.epidemiological_model_parameters[state]["beta"][index] * 0.875
-                )
-                economic_and_public_perception_rate = (
-                    self.population_dynamics_dataframes[state][
-                        "Economic and Public Perception Rate"
-                    ].iloc[-1]
-                    * 0.9965
-                )
-                self.no_npm_pm_counters[state] = 0
-                self.sdm_counters[state] += 1
-                self.lockdown_counters[state] = 0
-                self.mask_mandate_counters[state] += 1
-                self.vaccination_mandate_counters[state] = 0
-
-            elif actions[state] == 6:  # SDM and Vaccination Mandates 0.993
-                beta = (
-                    self.epidemiological_model_parameters[state]["beta"][index] * 0.825
-                )
-                economic_and_public_perception_rate = (
-                    self.population_dynamics_dataframes[state][
-                        "Economic and Public Perception Rate"
-                    ].iloc[-1]
-                    * 0.993
-                )
-                self.no_npm_pm_counters[state] = 0
-                self.sdm_counters[state] += 1
-                self.lockdown_counters[state] = 0
-                self.mask_mandate_counters[state] = 0
-                self.vaccination_mandate_counters[state] += 1
-
-            elif actions[state] == 7:  # Lockdown and Public Mask Mandates 0.9965
-                beta = (
-                    self.epidemiological_model_parameters[state]["beta"][index] * 0.75
-                )
-                economic_and_public_perception_rate = (
-                    self.population_dynamics_dataframes[state][
-                        "Economic and Public Perception Rate"
-                    ].iloc[-1]
-                    * 0.994
-                )
-                self.no_npm_pm_counters[state] = 0
-                self.sdm_counters[state] = 0
-                self.lockdown_counters[state] += 1
-                self.mask_mandate_counters[state] += 1
-                self.vaccination_mandate_counters[state] = 0
-
-            elif actions[state] == 8:  # Lockdown and Vaccination Mandates 0.993
-                beta = (
-                    self.epidemiological_model_parameters[state]["beta"][index] * 0.80
-                )
-                economic_and_public_perception_rate = (
-                    self.population_dynamics_dataframes[state][
-                        "Economic and Public Perception Rate"
-                    ].iloc[-1]
-                    * 0.993
-                )
-                self.no_npm_pm_counters[state] = 0
-                self.sdm_counters[state] = 0
-                self.lockdown_counters[state] += 1
-                self.mask_mandate_counters[state] = 0
-                self.vaccination_mandate_counters[state] += 1
-
-            elif (
-                actions[state] == 9
-            ):  # Public Mask Mandates and Vaccination Mandates 0.9935
-                beta = (
-                    self.epidemiological_model_parameters[state]["beta"][index] * 0.90
-                )
-                economic_and_public_perception_rate = (
-                    self.population_dynamics_dataframes[state][
-                        "Economic and Public Perception Rate"
-                    ].iloc[-1]
-                    * 0.9935
-                )
-                self.no_npm_pm_counters[state] = 0
-                self.sdm_counters[state] = 0
-                self.lockdown_counters[state] = 0
-                self.mask_mandate_counters[state] += 1
-                self.vaccination_mandate_counters[state] += 1
-
-            elif (
-                actions[state] == 10
-            ):  # SDM, Public Mask Mandates and Vaccination Mandates 0.9925
-                beta = (
-                    self.epidemiological_model_parameters[state]["beta"][index] * 0.60
-                )
-                economic_and_public_perception_rate = (
-                    self.population_dynamics_dataframes[state][
-                        "Economic and Public Perception Rate"
-                    ].iloc[-1]
-                    * 0.9925
-                )
-                self.no_npm_pm_counters[state] = 0
-                self.sdm_counters[state] += 1
-                self.lockdown_counters[state] = 0
-                self.mask_mandate_counters[state] += 1
-                self.vaccination_mandate_counters[state] += 1
-
-            elif (
-                actions[state] == 11
-            ):  # Lockdown, Public Mask Mandates and Vaccination Mandates 0.9925
-                beta = (
-                    self.epidemiological_model_parameters[state]["beta"][index] * 0.60
-                )
-                economic_and_public_perception_rate = (
-                    self.population_dynamics_dataframes[state][
-                        "Economic and Public Perception Rate"
-                    ].iloc[-1]
-                    * 0.9925
-                )
-                self.no_npm_pm_counters[state] = 0
-                self.sdm_counters[state] = 0
-                self.lockdown_counters[state] += 1
-                self.mask_mandate_counters[state] += 1
-                self.vaccination_mandate_counters[state] += 1
+        for state_index, state in enumerate(self.states):
+            action = int(actions[state_index])
+            self.action_histories[state].append(action)
 
-            else:
-                print("Invalid Action")
+            # The action history can belong to another branch after restore_snapshot, so the previous action is taken
+            # from the current action (0 at the start of the episode).
+            self.previous_actions[state] = self.current_actions[state]
+            self.current_actions[state] = action
 
-            (
-                self.population_dynamics_dataframes,
-                self.new_cases,
-            ) = self.population_dynamics_computer.compute_population_dynamics(
-                action=actions[state],
-                beta=beta,
-                environment_config=self.environment_config,
-                epidemiological_model_data=self.epidemiological_model_data,
-                epidemiological_model_parameters=self.epidemiological_model_parameters,
-                new_cases=self.new_cases,
-                population_dynamics_dataframes=self.population_dynamics_dataframes,
-                state=state,
-                state_populations=self.state_populations,
-                timestep=self.timestep,
-            )
-
-            self.population_dynamics_dataframes[state][
+        (
+            population_dynamics,
+            new_cases,
+            self.action_counters,
+            self.episode_model_parameter_values,
+            self.episode_model_parameter_splits,
+        ) = self.simulation_step_computer(
+            population_dynamics=self.population_dynamics.current(),
+            actions=actions,
+            action_counters=self.action_counters,
+            model_parameter_values=self.episode_model_parameter_values,
+            model_parameter_splits=self.episode_model_parameter_splits,
+            noise=self.episode_noise[self.timestep],
+            timesteps=self.timestep,
+            state_indices=self.state_indices,
+            state_populations=self.state_population_values,
+            telemetry=telemetry,
+        )
+        self.population_dynamics.append_rows(population_dynamics)
+
+        infected = population_dynamics[
+            :, self.population_dynamics.column_indices["Infected"]
+        ]
+        economic_and_public_perception_rates = population_dynamics[
+            :,
+            self.population_dynamics.column_indices[
                 "Economic and Public Perception Rate"
-            ].iloc[self.timestep + 1] = economic_and_public_perception_rate
-            print("\n\nAfter EPP:\n", self.population_dynamics_dataframes[state])
-
-            # Checking which actions are allowed:
-            # Potential Violations (If the action is not taken in the next time-step.):
-            no_npm_pm_min_period_violation = (
-                True
-                if (0 < self.no_npm_pm_counters[state] < self.min_no_npm_pm_period)
-                else False
-            )
-            sdm_min_period_violation = (
-                True if (0 < self.sdm_counters[state] < self.min_sdm_period) else False
-            )
-            lockdown_min_period_violation = (
-                True
-                if (0 < self.lockdown_counters[state] < self.min_lockdown_period)
-                else False
-            )
-            mask_mandate_min_period_violation = (
-                True
-                if (
-                    0 < self.mask_mandate_counters[state] < self.min_mask_mandate_period
-                )
-                else False
-            )
-            vaccination_mandate_min_period_violation = (
-                True
-                if (
-                    0
-                    < self.vaccination_mandate_counters[state]
-                    < self.min_vaccination_mandate_period
-                )
-                else False
-            )
-
-            # Potential Violations (If the action is taken in the next time-step.):
-            no_npm_pm_max_period_violation = (
-                True
-                if (self.no_npm_pm_counters[state] >= self.max_no_npm_pm_period)
-                else False
-            )
-            sdm_max_period_violation = (
-                True if (self.sdm_counters[state] >= self.max_sdm_period) else False
-            )
-            lockdown_max_period_violation = (
-                True
-                if (self.lockdown_counters[state] >= self.max_lockdown_period)
-                else False
-            )
-            mask_mandate_max_period_violation = (
-                True
-                if (self.mask_mandate_counters[state] >= self.max_mask_mandate_period)
-                else False
-            )
-            vaccination_mandate_max_period_violation = (
-                True
-                if (
-                    self.vaccination_mandate_counters[state]
-                    >= self.max_vaccination_mandate_period
-                )
-                else False
-            )
+            ],
+        ]
 
-            # Required Actions (As in not taking them will result in minimum violation):
-            no_npm_pm_required = True if no_npm_pm_min_period_violation else False
-            sdm_required = True if sdm_min_period_violation else False
-            lockdown_required = True if lockdown_min_period_violation else False
-            mask_mandate_required = True if mask_mandate_min_period_violation else False
-            vaccination_mandate_required = (
-                True if vaccination_mandate_min_period_violation else False
-            )
-
-            # Allowed Actions
-            no_npm_pm_allowed = (
-                True
-                if (
-                    (not sdm_min_period_violation)
-                    and (not lockdown_min_period_violation)
-                    and (not mask_mandate_min_period_violation)
-                    and (not vaccination_mandate_min_period_violation)
-                    and (not no_npm_pm_max_period_violation)
-                )
-                else False
-            )
-
-            sdm_allowed = (
-                True
-                if (
-                    (not no_npm_pm_min_period_violation)
-                    and (not lockdown_min_period_violation)
-                    and (not sdm_max_period_violation)
-                )
-                else False
-            )
+        if telemetry.enabled:
+            phase_start = telemetry.start()
 
-            lockdown_allowed = (
-                True
-                if (
-                    (not no_npm_pm_min_period_violation)
-                    and (not sdm_min_period_violation)
-                    and (not lockdown_max_period_violation)
-                )
-                else False
-            )
+        # Checking which actions are allowed and required for the next time-step.
+        (
+            self.allowed_actions,
+            self.required_actions,
+            self.allowed_actions_numbers,
+        ) = self.action_legality_computer(self.action_counters)
 
-            mask_mandate_allowed = (
-                True
-                if (
-                    (not no_npm_pm_min_period_violation)
-                    and (not mask_mandate_max_period_violation)
-                )
-                else False
-            )
+        if telemetry.enabled:
+            phase_start = telemetry.lap("masks", phase_start)
 
-            vaccination_mandate_allowed = (
-                True
-                if (
-                    (not no_npm_pm_min_period_violation)
-                    and (not vaccination_mandate_max_period_violation)
-                )
-                else False
-            )
+        state_rewards = self.simulation_step_computer.rewards(
+            population_dynamics=population_dynamics,
+            state_populations=self.state_population_values,
+            infection_coefficient=self.infection_coefficient,
+        )
 
-            # Updating the lists for allowed and required actions.
-            self.allowed_actions[state] = [
-                no_npm_pm_allowed,
-                sdm_allowed,
-                lockdown_allowed,
-                mask_mandate_allowed,
-                vaccination_mandate_allowed,
-            ]
-            self.required_actions[state] = [
-                no_npm_pm_required,
-                sdm_required,
-                lockdown_required,
-                mask_mandate_required,
-                vaccination_mandate_required,
-            ]
+        for state_index, state in enumerate(self.states):
+            self.new_cases[state].append(int(new_cases[state_index]))
 
-            # Logic to determine which action as per the numbers is allowed.
-            # (Each list within the list is a set of actions corresponding to the five "isolated" actions.)
-            action_association_list = [
-                [0],
-                [1, 5, 6, 10],
-                [2, 7, 8, 11],
-                [3, 5, 7, 9, 10, 11],
-                [4, 6, 8, 9, 10, 11],
-            ]
-            actions_allowed = None
-
-            # First we simply go through the required actions and find the set of associated actions. This can lead to a
-            # situation in which for e.g., the mask mandate action is required but not all other actions in the action
-            # association list such as lockdown are allowed are included. We remove them with the next for loop.
-            for i in range(5):
-                if self.required_actions[state][i]:
-                    if actions_allowed is None:
-                        actions_allowed = set(action_association_list[i])
-                    else:
-                        # Set intersection operator.
-                        actions_allowed = actions_allowed & set(
-                            action_association_list[i]
-                        )
-
-            # Here we check if the "actions_allowed" set contains any actions that are in fact not allowed
-            # (and not required). We remove such actions from the set with by taking a difference between the sets.
-            for i in range(5):
-                if (
-                    not self.allowed_actions[state][i]
-                    and not self.required_actions[state][i]
-                ):
-                    if actions_allowed is None:
-                        break
-                    else:
-                        actions_allowed = actions_allowed.difference(
-                            set(action_association_list[i])
-                        )
-
-            # Exception case.
-            if actions_allowed is None:
-                for i in range(5):
-                    if self.allowed_actions[state][i]:
-                        if actions_allowed is None:
-                            actions_allowed = set(action_association_list[i])
-                        else:
-                            actions_allowed = actions_allowed.union(
-                                set(action_association_list[i])
-                            )
-                for i in range(5):
-                    if not self.allowed_actions[state][i]:
-                        actions_allowed = actions_allowed.difference(
-                            set(action_association_list[i])
-                        )
-
-            actions_allowed = list(actions_allowed)
-            self.allowed_actions_numbers[state] = [
-                1 if i in actions_allowed else 0 for i in range(self.action_space.n)
-            ]
-
-            # Reward
-            rewards[state] = (
-                -self.infection_coefficient
-                * self.population_dynamics_dataframes[state]["Infected"].iloc[-1]
-                / self.state_populations[state]
-                + self.population_dynamics_dataframes[state][
-                    "Economic and Public Perception Rate"
-                ].iloc[-1]
-            )
+            rewards[state] = state_rewards[state_index]
 
             state_observation = [
-                self.population_dynamics_dataframes[state]["Infected"].iloc[-1]
-                / self.state_populations[state],
-                self.population_dynamics_dataframes[state][
-                    "Economic and Public Perception Rate"
-                ].iloc[-1],
+                infected[state_index] / self.state_populations[state],
+                economic_and_public_perception_rates[state_index],
                 self.previous_actions[state],
                 self.current_actions[state],
             ]
@@ -662,8 +319,7 @@ class EpidemicSimulationMA(gym.Env):
             terminations[state] = (
                 True
                 if (
-                    self.population_dynamics_dataframes[state]["Infected"].iloc[-1]
-                    >= 0.99 * self.state_populations[state]
+                    infected[state_index] >= 0.99 * self.state_populations[state]
                     or self.timestep >= self.max_timesteps
                 )
                 else False
@@ -671,12 +327,84 @@ class EpidemicSimulationMA(gym.Env):
             truncations[state] = False
             infos[state] = {}
 
-        print("Timestep Before:", self.timestep)
+        if telemetry.enabled:
+            telemetry.lap("reward", phase_start)
+            telemetry.emit(
+                "step",
+                timestep=self.timestep,
+                states=self.states,
+                actions=actions,
+                population_dynamics=population_dynamics,
+                rewards=rewards,
+            )
+
         self.timestep += 1
-        print("Timestep After:", self.timestep)
 
         return observations, rewards, terminations, truncations, infos
 
+    def action_masks(self):
+        """This method returns the masks of the actions that are allowed in the next time-step.
+
+        :returns action_masks: - Boolean array (states x actions) in the order of self.states.
+        """
+
+        return self.allowed_actions_numbers.astype(bool)
+
+    def get_snapshot(self):
+        """This method captures the mutable state of the simulation so that it can be restored later (e.g., to branch
+        rollouts during lookahead planning). Only the current compartments, counters and pointers into the recorded
+        history are copied, not the history itself.
+
+        :returns snapshot: - Dictionary of arrays (in the order of self.states) that can be passed to
+                             restore_snapshot."""
+
+        return {
+            "timestep": self.timestep,
+            "population_dynamics": self.population_dynamics.current(),
+            "population_dynamics_lengths": self.population_dynamics.lengths.copy(),
+            "previous_actions": np.array(
+                [self.previous_actions[state] for state in self.states]
+            ),
+            "current_actions": np.array(
+                [self.current_actions[state] for state in self.states]
+            ),
+            "action_counters": self.action_counters.copy(),
+            "allowed_actions": self.allowed_actions.copy(),
+            "required_actions": self.required_actions.copy(),
+            "allowed_actions_numbers": self.allowed_actions_numbers.copy(),
+            "episode_model_parameter_values": self.episode_model_parameter_values,
+            "episode_model_parameter_splits": self.episode_model_parameter_splits,
+        }
+
+    def restore_snapshot(self, snapshot):
+        """This method restores the state of the simulation captured by get_snapshot.
+
+        The recorded history (population dynamics, action histories and new cases) is rewound to the pointers of the
+        snapshot. It is only exact when the snapshot was taken earlier on the current branch of the episode; the
+        state that determines the next steps is always restored exactly. The noise is drawn for the whole episode at
+        reset, so snapshots are restored within the episode they were taken in.
+
+        :param snapshot: Dictionary returned by get_snapshot."""
+
+        self.timestep = snapshot["timestep"]
+        self.population_dynamics.rewind(
+            lengths=snapshot["population_dynamics_lengths"],
+            rows=snapshot["population_dynamics"],
+        )
+        for state_index, state in enumerate(self.states):
+            del self.action_histories[state][self.timestep :]
+            del self.new_cases[state][self.timestep :]
+            self.previous_actions[state] = int(
+                snapshot["previous_actions"][state_index]
+            )
+            self.current_actions[state] = int(snapshot["current_actions"][state_index])
+        self.action_counters = snapshot["action_counters"].copy()
+        self.allowed_actions = snapshot["allowed_actions"].copy()
+        self.required_actions = snapshot["required_actions"].copy()
+        self.allowed_actions_numbers = snapshot["allowed_actions_numbers"].copy()
+        self.episode_model_parameter_values = snapshot["episode_model_parameter_values"]
+        self.episode_model_parameter_splits = snapshot["episode_model_parameter_splits"]
+
     def render(self, mode="human"):
         """This method renders the statistical graph of the population.
 
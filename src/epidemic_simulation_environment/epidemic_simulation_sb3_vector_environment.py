@@ -0,0 +1,86 @@
+# Imports
+import numpy as np
+from stable_baselines3.common.vec_env import VecEnv
+
+
+class EpidemicSimulationSB3VecEnv(VecEnv):
+    """This class exposes an EpidemicSimulationVecEnv through the stable-baselines3 VecEnv interface, so the batched
+    episodes can be used directly by the stable-baselines3 (and sb3-contrib) algorithms without subprocesses."""
+
+    def __init__(self, vector_environment):
+        """This method initializes the wrapper.
+
+        :param vector_environment: EpidemicSimulationVecEnv simulating the episodes."""
+
+        self.vector_environment = vector_environment
+        super().__init__(
+            num_envs=vector_environment.num_envs,
+            observation_space=vector_environment.single_observation_space,
+            action_space=vector_environment.single_action_space,
+        )
+        self.actions = None
+
+    def reset(self):
+        """This method resets all the episodes and returns their observations."""
+
+        observations, _ = self.vector_environment.reset(seed=self._seeds[0])
+        self._reset_seeds()
+
+        return observations
+
+    def step_async(self, actions):
+        self.actions = actions
+
+    def step_wait(self):
+        """This method steps all the episodes and converts the results to the stable-baselines3 conventions (a list
+        of info dictionaries holding the terminal observations of the episodes that ended)."""
+
+        (
+            observations,
+            rewards,
+            terminations,
+            truncations,
+            infos,
+        ) = self.vector_environment.step(self.actions)
+        dones = terminations | truncations
+
+        episode_infos = [
+            {"action_mask": infos["action_mask"][episode]}
+            for episode in range(self.num_envs)
+        ]
+        for episode in np.flatnonzero(dones):
+            episode_infos[episode]["terminal_observation"] = infos[
+                "final_observation"
+            ][episode]
+            episode_infos[episode]["TimeLimit.truncated"] = bool(
+                truncations[episode] and not terminations[episode]
+            )
+
+        return observations, rewards, dones, episode_infos
+
+    def close(self):
+        self.vector_environment.close()
+
+    def get_attr(self, attr_name, indices=None):
+        return [
+            getattr(self.vector_environment, attr_name)
+            for _ in self._get_indices(indices)
+        ]
+
+    def set_attr(self, attr_name, value, indices=None):
+        setattr(self.vector_environment, attr_name, value)
+
+    def env_method(self, method_name, *method_args, indices=None, **method_kwargs):
+        """This method calls a method of the vectorized environment. The action masks are split per episode, as
+        expected by the maskable algorithms of sb3-contrib."""
+
+        result = getattr(self.vector_environment, method_name)(
+            *method_args, **method_kwargs
+        )
+        if method_name == "action_masks":
+            return [result[episode] for episode in self._get_indices(indices)]
+
+        return [result for _ in self._get_indices(indices)]
+
+    def env_is_wrapped(self, wrapper_class, indices=None):
+        return [False for _ in self._get_indices(indices)]
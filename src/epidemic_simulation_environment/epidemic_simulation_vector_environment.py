@@ -0,0 +1,276 @@
+# Imports
+from typing import Any, List, Optional, Union
+import numpy as np
+from gymnasium import spaces
+from gymnasium.utils import seeding
+from gymnasium.vector import VectorEnv
+from src.utilities.parameter_initializer import ParameterInitializer
+from src.epidemic_simulation_environment.population_dynamics_computer import (
+    epidemiological_model_parameter_names,
+)
+from src.epidemic_simulation_environment.population_dynamics_store import (
+    population_dynamics_columns,
+)
+from src.epidemic_simulation_environment.simulation_step_computer import (
+    initialize_simulation,
+)
+from src.utilities.step_telemetry import StepTelemetry
+
+
+# Defining the Vectorized Epidemic Simulation Environment.
+# noinspection DuplicatedCode
+class EpidemicSimulationVecEnv(VectorEnv):
+    """This class implements a batch of independent Disease Mitigation episodes that are stepped together.
+
+    Each of the num_envs episodes simulates a single state (episode i simulates states[i % len(states)]). The data of
+    the states is loaded once and shared by all the episodes, and the mutable state of the episodes is held in arrays
+    with a leading episode dimension, so a step of all the episodes is a handful of vectorized operations. Episodes
+    are reset automatically when they end, following the gymnasium VectorEnv conventions.
+    """
+
+    def __init__(self, env_config, num_envs):
+        """This method initializes the environment parameters.
+
+        :param env_config: Dictionary containing the configuration for environment initialization. Besides the keys
+                           used by EpidemicSimulationMA, "states" optionally selects the states that are simulated.
+        :param num_envs: Integer - Number of episodes that are simulated at once."""
+
+        super().__init__(
+            num_envs=num_envs,
+            observation_space=spaces.Box(
+                low=0, high=np.inf, shape=(4,), dtype=np.float64
+            ),
+            action_space=spaces.Discrete(12),
+        )
+
+        self.environment_config = env_config
+        self.telemetry = StepTelemetry(enabled=env_config.get("telemetry", False))
+
+        self.parameter_initializer = ParameterInitializer(
+            data_path=env_config["data_path"],
+            simulation_start_date=env_config["simulation_start_date"],
+        )
+
+        self.states = env_config.get(
+            "states", self.parameter_initializer.initialize_state_names()
+        )
+        self.parameter_initializer.initialize_epidemiological_model_data()
+
+        # Data and computers of the states, shared by all the episodes.
+        (
+            epidemiological_model_arrays,
+            self.action_effects,
+            self.action_legality_computer,
+            self.simulation_step_computer,
+        ) = initialize_simulation(
+            parameter_initializer=self.parameter_initializer,
+            states=self.states,
+            env_config=env_config,
+            number_of_actions=self.single_action_space.n,
+        )
+
+        # Initial population dynamics of the states (states x columns).
+        self.initial_population_dynamics = (
+            self.parameter_initializer.initialize_initial_population_dynamics(
+                states=self.states, columns=population_dynamics_columns
+            )
+        )
+        self.column_indices = {
+            column: index for index, column in enumerate(population_dynamics_columns)
+        }
+
+        # Hyperparameters for reward function.
+        self.infection_coefficient = 500_000
+
+        self.max_timesteps = 181
+
+        # Data of the states (shared by all the episodes) and the state simulated by each episode.
+        self.state_indices = np.arange(num_envs) % len(self.states)
+        self.state_population_values = epidemiological_model_arrays["state_populations"]
+        self.state_populations = self.state_population_values[self.state_indices]
+
+        # Mutable state of the episodes.
+        self.population_dynamics = np.empty_like(
+            self.initial_population_dynamics[self.state_indices]
+        )
+        self.new_cases = np.zeros(num_envs, dtype=int)
+        self.timesteps = np.zeros(num_envs, dtype=int)
+        self.previous_actions = np.zeros(num_envs, dtype=int)
+        self.current_actions = np.zeros(num_envs, dtype=int)
+        self.action_counters = np.zeros((num_envs, 5), dtype=int)
+        self.allowed_actions_numbers = np.ones(
+            (num_envs, self.single_action_space.n), dtype=int
+        )
+        self.actions = np.zeros(num_envs, dtype=int)
+
+        # Noisy model parameters of the current split of every episode (num_envs x parameters), as in
+        # EpidemicSimulationMA.
+        self.episode_model_parameter_values = np.zeros(
+            (num_envs, len(epidemiological_model_parameter_names))
+        )
+        self.episode_model_parameter_splits = np.zeros(num_envs, dtype=int)
+
+        self.reset_episodes(np.ones(num_envs, dtype=bool))
+
+    def reset_episodes(self, episodes):
+        """This method resets a subset of the episodes.
+
+        :param episodes: Boolean array (num_envs) selecting the episodes to reset."""
+
+        self.population_dynamics[episodes] = self.initial_population_dynamics[
+            self.state_indices[episodes]
+        ]
+        self.new_cases[episodes] = 0
+        self.timesteps[episodes] = 0
+        self.previous_actions[episodes] = 0
+        self.current_actions[episodes] = 0
+        self.action_counters[episodes] = 0
+        self.allowed_actions_numbers[episodes] = 1
+        self.episode_model_parameter_splits[episodes] = -1
+
+    def observations(self):
+        """This method returns the observations of all the episodes (num_envs x 4): the infected fraction of the
+        population, the economic and public perception rate, and the previous and current actions.
+        """
+
+        return np.column_stack(
+            [
+                self.population_dynamics[:, self.column_indices["Infected"]]
+                / self.state_populations,
+                self.population_dynamics[
+                    :, self.column_indices["Economic and Public Perception Rate"]
+                ],
+                self.previous_actions,
+                self.current_actions,
+            ]
+        )
+
+    def action_masks(self):
+        """This method returns the masks of the actions that are allowed in the next time-step.
+
+        :returns action_masks: - Boolean array (num_envs x actions)."""
+
+        return self.allowed_actions_numbers.astype(bool)
+
+    def reset_wait(
+        self,
+        seed: Optional[Union[int, List[int]]] = None,
+        options: Optional[dict[str, Any]] = None,
+    ):
+        """This method resets all the episodes and returns their observations.
+
+        :param seed: Integer seeding the random number generator shared by all the episodes.
+        :param options: Not used.
+
+        :returns observations: - Array (num_envs x 4).
+                 infos: - Dictionary containing the action masks."""
+
+        if seed is not None:
+            if not isinstance(seed, int):
+                seed = seed[0]
+            self._np_random, seed = seeding.np_random(seed)
+
+        self.reset_episodes(np.ones(self.num_envs, dtype=bool))
+
+        return self.observations(), {
+            "action_mask": self.action_masks(),
+            "_action_mask": np.ones(self.num_envs, dtype=bool),
+        }
+
+    def step_async(self, actions):
+        """This method stores the actions for the next call of step_wait.
+
+        :param actions: Array (num_envs) of the actions of the episodes."""
+
+        self.actions = np.array(actions, dtype=int)
+
+    def step_wait(self, **kwargs):
+        """This method steps all the episodes with the actions given to step_async. The episodes that end are reset,
+        and their final observations are returned in the infos.
+
+        :returns observations: - Array (num_envs x 4).
+                 rewards: - Array (num_envs).
+                 terminations: - Boolean array (num_envs).
+                 truncations: - Boolean array (num_envs).
+                 infos: - Dictionary containing the action masks and, for the episodes that ended, the final
+                          observations."""
+
+        telemetry = self.telemetry
+        actions = self.actions
+
+        self.previous_actions = self.current_actions
+        self.current_actions = actions
+
+        (
+            self.population_dynamics,
+            self.new_cases,
+            self.action_counters,
+            self.episode_model_parameter_values,
+            self.episode_model_parameter_splits,
+        ) = self.simulation_step_computer(
+            population_dynamics=self.population_dynamics,
+            actions=actions,
+            action_counters=self.action_counters,
+            model_parameter_values=self.episode_model_parameter_values,
+            model_parameter_splits=self.episode_model_parameter_splits,
+            noise=self.np_random.standard_normal(
+                (self.num_envs, 1 + len(epidemiological_model_parameter_names))
+            ),
+            timesteps=self.timesteps,
+            state_indices=self.state_indices,
+            state_populations=self.state_populations,
+            telemetry=telemetry,
+        )
+
+        if telemetry.enabled:
+            phase_start = telemetry.start()
+
+        # Checking which actions are allowed for the next time-step.
+        _, _, self.allowed_actions_numbers = self.action_legality_computer(
+            self.action_counters
+        )
+
+        if telemetry.enabled:
+            phase_start = telemetry.lap("masks", phase_start)
+
+        infected = self.population_dynamics[:, self.column_indices["Infected"]]
+        rewards = self.simulation_step_computer.rewards(
+            population_dynamics=self.population_dynamics,
+            state_populations=self.state_populations,
+            infection_coefficient=self.infection_coefficient,
+        )
+
+        # The episode terminates when the number of infected people becomes greater than 99 % of the population.
+        terminations = (infected >= 0.99 * self.state_populations) | (
+            self.timesteps >= self.max_timesteps
+        )
+        truncations = np.zeros(self.num_envs, dtype=bool)
+
+        if telemetry.enabled:
+            telemetry.lap("reward", phase_start)
+            telemetry.emit(
+                "step",
+                timesteps=self.timesteps,
+                actions=actions,
+                population_dynamics=self.population_dynamics,
+                rewards=rewards,
+            )
+
+        self.timesteps += 1
+
+        observations = self.observations()
+        infos = {}
+        if terminations.any():
+            final_observations = np.empty(self.num_envs, dtype=object)
+            for episode in np.flatnonzero(terminations):
+                final_observations[episode] = observations[episode]
+            infos["final_observation"] = final_observations
+            infos["_final_observation"] = terminations.copy()
+
+            self.reset_episodes(terminations)
+            observations = self.observations()
+
+        infos["action_mask"] = self.action_masks()
+        infos["_action_mask"] = np.ones(self.num_envs, dtype=bool)
+
+        return observations, rewards, terminations, truncations, infos
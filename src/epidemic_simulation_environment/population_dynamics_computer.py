@@ -9,9 +9,31 @@ from scipy.stats import hmean
 from sklearn.metrics import mean_absolute_percentage_error, mean_squared_error
 
 from multiprocessing import Pool
+from src.epidemic_simulation_environment.population_dynamics_store import (
+    population_dynamics_columns,
+)
 from src.settings import data_directory
 from src.utilities.parameter_initializer import ParameterInitializer
 
+# Epidemiological model parameters used by the vectorized population dynamics. The rates of each vaccination group
+# (uv, fv, bv) are contiguous so that they can be sliced together.
+epidemiological_model_rate_names = [
+    "sigma_s",
+    "sigma_r",
+    "zeta_s",
+    "zeta_r",
+    "delta",
+    "gamma_i",
+    "gamma_h",
+    "mu_i",
+    "mu_h",
+]
+epidemiological_model_parameter_names = ["alpha"] + [
+    f"{rate_name}_{vaccination_group}"
+    for rate_name in epidemiological_model_rate_names
+    for vaccination_group in ["uv", "fv", "bv"]
+]
+
 
 class PopulationDynamicsComputer:
     def __init__(self, population_dynamics_computer_configuration):
@@ -52,513 +74,179 @@ class PopulationDynamicsComputer:
         self.average_rmse = []
 
     @staticmethod
-    def compute_population_dynamics(
-            action,
+    def compute_vectorized_population_dynamics(
+            population_dynamics,
             beta,
-            environment_config,
-            epidemiological_model_data,
-            epidemiological_model_parameters,
-            new_cases,
-            population_dynamics_dataframes,
-            state,
+            model_parameters,
+            percentage_unvaccinated_to_fully_vaccinated,
+            percentage_fully_vaccinated_to_booster_vaccinated,
             state_populations,
-            timestep,
     ):
-        """This method computes the action dependent population dynamics
-        :parameter action: Integer - Represents the action taken by the agent
-        :param beta:
-        :param environment_config:
-        :param epidemiological_model_data
-        :param epidemiological_model_parameters
-        :param new_cases
-        :param population_dynamics_dataframes
-        :param state
-        :param state_populations
-        :param timestep
-        """
-
-        # Action dependent vaccination rates.
-        if action in [3, 5, 6, 7]:
-            percentage_unvaccinated_to_fully_vaccinated = 0.007084760245099044
-            # percentage_fully_vaccinated_to_booster_vaccinated = 0.0017285714029114
-            percentage_fully_vaccinated_to_booster_vaccinated = (
-                epidemiological_model_data[state][
-                    "percentage_fully_vaccinated_to_boosted"
-                ].iloc[timestep + 214]
-            )
-        else:
-            percentage_unvaccinated_to_fully_vaccinated = epidemiological_model_data[
-                state
-            ]["percentage_unvaccinated_to_fully_vaccinated"].iloc[timestep + 214]
-            percentage_fully_vaccinated_to_booster_vaccinated = (
-                epidemiological_model_data[state][
-                    "percentage_fully_vaccinated_to_boosted"
-                ].iloc[timestep + 214]
-            )
-
-        # Index to use the different model parameter values for the different splits.
-        index = int(np.floor((timestep + 214) / 28))
-
-        standard_deviation = 0.05
-
-        mu, sigma = beta, standard_deviation * beta
-        beta = np.random.normal(mu, sigma, 1)
-
-        for model_parameter in epidemiological_model_parameters[state]:
-            if model_parameter == "beta":
-                continue
-
-            mu, sigma = (
-                epidemiological_model_parameters[state][model_parameter][index],
-                standard_deviation
-                * epidemiological_model_parameters[state][model_parameter][index],
-            )
-            model_parameter_value = np.random.normal(mu, sigma, 1)[0]
-            epidemiological_model_parameters[state][model_parameter][
-                index
-            ] = model_parameter_value
-
-        # Susceptible Compartment
-        number_of_unvaccinated_susceptible_individuals = int(
-            population_dynamics_dataframes[state]["Susceptible_UV"].iloc[-1]
-            - (
-                    beta
-                    * population_dynamics_dataframes[state]["Susceptible_UV"].iloc[-1]
-                    * (
-                            population_dynamics_dataframes[state]["Infected"].iloc[-1]
-                            ** epidemiological_model_parameters[state]["alpha"][index]
-                    )
-                    / state_populations[state]
-            )
-            + epidemiological_model_parameters[state]["sigma_s_uv"][index]
-            * population_dynamics_dataframes[state]["Susceptible_UV"].iloc[-1]
-            - percentage_unvaccinated_to_fully_vaccinated
-            * population_dynamics_dataframes[state]["Susceptible_UV"].iloc[-1]
-        )
-
-        number_of_fully_vaccinated_susceptible_individuals = int(
-            population_dynamics_dataframes[state]["Susceptible_FV"].iloc[-1]
-            - beta
-            * population_dynamics_dataframes[state]["Susceptible_FV"].iloc[-1]
-            * (
-                    population_dynamics_dataframes[state]["Infected"].iloc[-1]
-                    ** epidemiological_model_parameters[state]["alpha"][index]
-            )
-            / state_populations[state]
-            + epidemiological_model_parameters[state]["sigma_s_fv"][index]
-            * population_dynamics_dataframes[state]["Exposed_FV"].iloc[-1]
-            + percentage_unvaccinated_to_fully_vaccinated
-            * population_dynamics_dataframes[state]["Susceptible_UV"].iloc[-1]
-            - percentage_fully_vaccinated_to_booster_vaccinated
-            * population_dynamics_dataframes[state]["Susceptible_FV"].iloc[-1]
-        )
-
-        number_of_booster_vaccinated_susceptible_individuals = int(
-            population_dynamics_dataframes[state]["Susceptible_BV"].iloc[-1]
-            - beta
-            * population_dynamics_dataframes[state]["Susceptible_BV"].iloc[-1]
-            * (
-                    population_dynamics_dataframes[state]["Infected"].iloc[-1]
-                    ** epidemiological_model_parameters[state]["alpha"][index]
-            )
-            / state_populations[state]
-            + epidemiological_model_parameters[state]["sigma_s_bv"][index]
-            * population_dynamics_dataframes[state]["Exposed_BV"].iloc[-1]
-            + percentage_fully_vaccinated_to_booster_vaccinated
-            * population_dynamics_dataframes[state]["Susceptible_FV"].iloc[-1]
-        )
-
-        number_of_susceptible_individuals = (
-                number_of_unvaccinated_susceptible_individuals
-                + number_of_fully_vaccinated_susceptible_individuals
-                + number_of_booster_vaccinated_susceptible_individuals
-        )
-
-        # Exposed Compartment
-        number_of_unvaccinated_exposed_individuals = int(
-            population_dynamics_dataframes[state]["Exposed_UV"].iloc[-1]
-            + beta
-            * population_dynamics_dataframes[state]["Susceptible_UV"].iloc[-1]
-            * (
-                    population_dynamics_dataframes[state]["Infected"].iloc[-1]
-                    ** epidemiological_model_parameters[state]["alpha"][index]
-            )
-            / state_populations[state]
-            + (
-                    beta
-                    * population_dynamics_dataframes[state]["Recovered_UV"].iloc[-1]
-                    * (
-                            population_dynamics_dataframes[state]["Infected"].iloc[-1]
-                            ** epidemiological_model_parameters[state]["alpha"][index]
-                    )
-                    / state_populations[state]
-            )
-            - epidemiological_model_parameters[state]["zeta_s_uv"][index]
-            * population_dynamics_dataframes[state]["Exposed_UV"].iloc[-1]
-            - epidemiological_model_parameters[state]["zeta_r_uv"][index]
-            * population_dynamics_dataframes[state]["Exposed_UV"].iloc[-1]
-            - epidemiological_model_parameters[state]["sigma_s_uv"][index]
-            * population_dynamics_dataframes[state]["Exposed_UV"].iloc[-1]
-            - epidemiological_model_parameters[state]["sigma_r_uv"][index]
-            * population_dynamics_dataframes[state]["Exposed_UV"].iloc[-1]
-            - percentage_unvaccinated_to_fully_vaccinated
-            * population_dynamics_dataframes[state]["Exposed_UV"].iloc[-1]
-        )
-
-        number_of_fully_vaccinated_exposed_individuals = int(
-            population_dynamics_dataframes[state]["Exposed_FV"].iloc[-1]
-            + beta
-            * population_dynamics_dataframes[state]["Susceptible_FV"].iloc[-1]
-            * (
-                    population_dynamics_dataframes[state]["Infected"].iloc[-1]
-                    ** epidemiological_model_parameters[state]["alpha"][index]
-            )
-            / state_populations[state]
-            + (
-                    beta
-                    * population_dynamics_dataframes[state]["Recovered_FV"].iloc[-1]
-                    * (
-                            population_dynamics_dataframes[state]["Infected"].iloc[-1]
-                            ** epidemiological_model_parameters[state]["alpha"][index]
-                    )
-                    / state_populations[state]
-            )
-            - epidemiological_model_parameters[state]["zeta_s_fv"][index]
-            * population_dynamics_dataframes[state]["Exposed_FV"].iloc[-1]
-            - epidemiological_model_parameters[state]["zeta_r_fv"][index]
-            * population_dynamics_dataframes[state]["Exposed_FV"].iloc[-1]
-            - epidemiological_model_parameters[state]["sigma_s_fv"][index]
-            * population_dynamics_dataframes[state]["Exposed_FV"].iloc[-1]
-            - epidemiological_model_parameters[state]["sigma_r_fv"][index]
-            * population_dynamics_dataframes[state]["Exposed_FV"].iloc[-1]
-            + percentage_unvaccinated_to_fully_vaccinated
-            * population_dynamics_dataframes[state]["Exposed_UV"].iloc[-1]
-            - percentage_fully_vaccinated_to_booster_vaccinated
-            * population_dynamics_dataframes[state]["Exposed_FV"].iloc[-1]
-        )
-
-        number_of_booster_vaccinated_exposed_individuals = int(
-            population_dynamics_dataframes[state]["Exposed_BV"].iloc[-1]
-            + beta
-            * population_dynamics_dataframes[state]["Susceptible_BV"].iloc[-1]
-            * (
-                    population_dynamics_dataframes[state]["Infected"].iloc[-1]
-                    ** epidemiological_model_parameters[state]["alpha"][index]
-            )
-            / state_populations[state]
-            + (
-                    beta
-                    * population_dynamics_dataframes[state]["Recovered_BV"].iloc[-1]
-                    * (
-                            population_dynamics_dataframes[state]["Infected"].iloc[-1]
-                            ** epidemiological_model_parameters[state]["alpha"][index]
-                    )
-                    / state_populations[state]
-            )
-            - epidemiological_model_parameters[state]["zeta_s_bv"][index]
-            * population_dynamics_dataframes[state]["Exposed_BV"].iloc[-1]
-            - epidemiological_model_parameters[state]["zeta_r_bv"][index]
-            * population_dynamics_dataframes[state]["Exposed_BV"].iloc[-1]
-            - epidemiological_model_parameters[state]["sigma_s_bv"][index]
-            * population_dynamics_dataframes[state]["Exposed_BV"].iloc[-1]
-            - epidemiological_model_parameters[state]["sigma_r_bv"][index]
-            * population_dynamics_dataframes[state]["Exposed_BV"].iloc[-1]
-            + percentage_fully_vaccinated_to_booster_vaccinated
-            * population_dynamics_dataframes[state]["Exposed_FV"].iloc[-1]
-        )
-
-        number_of_exposed_individuals = (
-                number_of_unvaccinated_exposed_individuals
-                + number_of_fully_vaccinated_exposed_individuals
-                + number_of_booster_vaccinated_exposed_individuals
-        )
-
-        # Infected Compartment
-        number_of_unvaccinated_infected_individuals = int(
-            population_dynamics_dataframes[state]["Infected_UV"].iloc[-1]
-            + epidemiological_model_parameters[state]["zeta_s_uv"][index]
-            * population_dynamics_dataframes[state]["Exposed_UV"].iloc[-1]
-            + epidemiological_model_parameters[state]["zeta_r_uv"][index]
-            * population_dynamics_dataframes[state]["Exposed_UV"].iloc[-1]
-            - epidemiological_model_parameters[state]["delta_uv"][index]
-            * population_dynamics_dataframes[state]["Infected_UV"].iloc[-1]
-            - epidemiological_model_parameters[state]["gamma_i_uv"][index]
-            * population_dynamics_dataframes[state]["Infected_UV"].iloc[-1]
-            - epidemiological_model_parameters[state]["mu_i_uv"][index]
-            * population_dynamics_dataframes[state]["Infected_UV"].iloc[-1]
-        )
-
-        number_of_fully_vaccinated_infected_individuals = int(
-            population_dynamics_dataframes[state]["Infected_FV"].iloc[-1]
-            + epidemiological_model_parameters[state]["zeta_s_fv"][index]
-            * population_dynamics_dataframes[state]["Exposed_FV"].iloc[-1]
-            + epidemiological_model_parameters[state]["zeta_r_fv"][index]
-            * population_dynamics_dataframes[state]["Exposed_FV"].iloc[-1]
-            - epidemiological_model_parameters[state]["delta_fv"][index]
-            * population_dynamics_dataframes[state]["Infected_FV"].iloc[-1]
-            - epidemiological_model_parameters[state]["gamma_i_fv"][index]
-            * population_dynamics_dataframes[state]["Infected_FV"].iloc[-1]
-            - epidemiological_model_parameters[state]["mu_i_fv"][index]
-            * population_dynamics_dataframes[state]["Infected_FV"].iloc[-1]
-        )
-
-        number_of_booster_vaccinated_infected_individuals = int(
-            population_dynamics_dataframes[state]["Infected_BV"].iloc[-1]
-            + epidemiological_model_parameters[state]["zeta_s_bv"][index]
-            * population_dynamics_dataframes[state]["Exposed_BV"].iloc[-1]
-            + epidemiological_model_parameters[state]["zeta_r_bv"][index]
-            * population_dynamics_dataframes[state]["Exposed_BV"].iloc[-1]
-            - epidemiological_model_parameters[state]["delta_bv"][index]
-            * population_dynamics_dataframes[state]["Infected_BV"].iloc[-1]
-            - epidemiological_model_parameters[state]["gamma_i_bv"][index]
-            * population_dynamics_dataframes[state]["Infected_BV"].iloc[-1]
-            - epidemiological_model_parameters[state]["mu_i_bv"][index]
-            * population_dynamics_dataframes[state]["Infected_BV"].iloc[-1]
-        )
-
-        number_of_infected_individuals = (
-                number_of_unvaccinated_infected_individuals
-                + number_of_fully_vaccinated_infected_individuals
-                + number_of_booster_vaccinated_infected_individuals
-        )
-
-        # DOUBLE CHECK:
-        new_cases[state].append(
-            int(
-                epidemiological_model_parameters[state]["zeta_s_uv"][index]
-                * population_dynamics_dataframes[state]["Exposed_UV"].iloc[-1]
-                + epidemiological_model_parameters[state]["zeta_r_uv"][index]
-                * population_dynamics_dataframes[state]["Exposed_UV"].iloc[-1]
-                + epidemiological_model_parameters[state]["zeta_s_fv"][index]
-                * population_dynamics_dataframes[state]["Exposed_FV"].iloc[-1]
-                + epidemiological_model_parameters[state]["zeta_r_fv"][index]
-                * population_dynamics_dataframes[state]["Exposed_FV"].iloc[-1]
-                + epidemiological_model_parameters[state]["zeta_s_bv"][index]
-                * population_dynamics_dataframes[state]["Exposed_BV"].iloc[-1]
-                + epidemiological_model_parameters[state]["zeta_r_bv"][index]
-                * population_dynamics_dataframes[state]["Exposed_BV"].iloc[-1]
-            )
-        )
-
-        # Hospitalized Compartment
-        number_of_unvaccinated_hospitalized_individuals = int(
-            population_dynamics_dataframes[state]["Hospitalized_UV"].iloc[-1]
-            + epidemiological_model_parameters[state]["delta_uv"][index]
-            * population_dynamics_dataframes[state]["Infected_UV"].iloc[-1]
-            - epidemiological_model_parameters[state]["gamma_h_uv"][index]
-            * population_dynamics_dataframes[state]["Hospitalized_UV"].iloc[-1]
-            - epidemiological_model_parameters[state]["mu_h_uv"][index]
-            * population_dynamics_dataframes[state]["Hospitalized_UV"].iloc[-1]
-        )
-
-        number_of_fully_vaccinated_hospitalized_individuals = int(
-            population_dynamics_dataframes[state]["Hospitalized_FV"].iloc[-1]
-            + epidemiological_model_parameters[state]["delta_fv"][index]
-            * population_dynamics_dataframes[state]["Infected_FV"].iloc[-1]
-            - epidemiological_model_parameters[state]["gamma_h_fv"][index]
-            * population_dynamics_dataframes[state]["Hospitalized_FV"].iloc[-1]
-            - epidemiological_model_parameters[state]["mu_h_fv"][index]
-            * population_dynamics_dataframes[state]["Hospitalized_FV"].iloc[-1]
-        )
+        """This method computes the population dynamics of the next timestep for any number of states at once, on
+        arrays with arbitrary leading dimensions. The terms of every compartment are summed in a fixed order before the
+        truncation to whole individuals, so the results don't depend on the batch shape.
+
+        :param population_dynamics: Array (..., columns) - Population dynamics of the current timestep in the order
+                                    of population_dynamics_columns.
+        :param beta: Array (...) - Exposure rates.
+        :param model_parameters: Array (..., parameters) - Epidemiological model parameters of the current split in
+                                 the order of epidemiological_model_parameter_names.
+        :param percentage_unvaccinated_to_fully_vaccinated: Array (...)
+        :param percentage_fully_vaccinated_to_booster_vaccinated: Array (...)
+        :param state_populations: Array (...)
+
+        :returns next_population_dynamics: Array (..., columns) - Population dynamics of the next timestep. The
+                                           "Economic and Public Perception Rate" column is carried over unchanged.
+                 new_cases: Array (...) - Number of new cases."""
+
+        def column_indices(compartment_name):
+            return [
+                population_dynamics_columns.index(f"{compartment_name}_{vaccination_group}")
+                for vaccination_group in ["UV", "FV", "BV"]
+            ]
 
-        number_of_booster_vaccinated_hospitalized_individuals = int(
-            population_dynamics_dataframes[state]["Hospitalized_BV"].iloc[-1]
-            + epidemiological_model_parameters[state]["delta_bv"][index]
-            * population_dynamics_dataframes[state]["Infected_BV"].iloc[-1]
-            - epidemiological_model_parameters[state]["gamma_h_bv"][index]
-            * population_dynamics_dataframes[state]["Hospitalized_BV"].iloc[-1]
-            - epidemiological_model_parameters[state]["mu_h_bv"][index]
-            * population_dynamics_dataframes[state]["Hospitalized_BV"].iloc[-1]
-        )
+        def rates(rate_name):
+            start = epidemiological_model_parameter_names.index(f"{rate_name}_uv")
+            return model_parameters[..., start: start + 3]
 
-        number_of_hospitalized_individuals = (
-                number_of_unvaccinated_hospitalized_individuals
-                + number_of_fully_vaccinated_hospitalized_individuals
-                + number_of_booster_vaccinated_hospitalized_individuals
-        )
+        vaccination_status_indices = [
+            population_dynamics_columns.index("unvaccinated_individuals"),
+            population_dynamics_columns.index("fully_vaccinated_individuals"),
+            population_dynamics_columns.index("booster_vaccinated_individuals"),
+        ]
 
-        # Recovered Compartment
-        number_of_unvaccinated_recovered_individuals = int(
-            population_dynamics_dataframes[state]["Recovered_UV"].iloc[-1]
-            - (
-                    beta
-                    * population_dynamics_dataframes[state]["Recovered_UV"].iloc[-1]
-                    * (
-                            population_dynamics_dataframes[state]["Infected"].iloc[-1]
-                            ** epidemiological_model_parameters[state]["alpha"][index]
-                    )
-                    / state_populations[state]
-            )
-            + epidemiological_model_parameters[state]["sigma_r_uv"][index]
-            * population_dynamics_dataframes[state]["Exposed_UV"].iloc[-1]
-            + epidemiological_model_parameters[state]["gamma_i_uv"][index]
-            * population_dynamics_dataframes[state]["Infected_UV"].iloc[-1]
-            + epidemiological_model_parameters[state]["gamma_h_uv"][index]
-            * population_dynamics_dataframes[state]["Hospitalized_UV"].iloc[-1]
-            - percentage_unvaccinated_to_fully_vaccinated
-            * population_dynamics_dataframes[state]["Recovered_UV"].iloc[-1]
-        )
+        susceptible = population_dynamics[..., column_indices("Susceptible")]
+        exposed = population_dynamics[..., column_indices("Exposed")]
+        infected = population_dynamics[..., column_indices("Infected")]
+        hospitalized = population_dynamics[..., column_indices("Hospitalized")]
+        recovered = population_dynamics[..., column_indices("Recovered")]
+        deceased = population_dynamics[..., column_indices("Deceased")]
+        vaccination_status = population_dynamics[..., vaccination_status_indices]
 
-        number_of_fully_vaccinated_recovered_individuals = int(
-            population_dynamics_dataframes[state]["Recovered_FV"].iloc[-1]
-            - (
-                    beta
-                    * population_dynamics_dataframes[state]["Recovered_FV"].iloc[-1]
-                    * (
-                            population_dynamics_dataframes[state]["Infected"].iloc[-1]
-                            ** epidemiological_model_parameters[state]["alpha"][index]
-                    )
-                    / state_populations[state]
-            )
-            + epidemiological_model_parameters[state]["sigma_r_fv"][index]
-            * population_dynamics_dataframes[state]["Exposed_FV"].iloc[-1]
-            + epidemiological_model_parameters[state]["gamma_i_fv"][index]
-            * population_dynamics_dataframes[state]["Infected_FV"].iloc[-1]
-            + epidemiological_model_parameters[state]["gamma_h_fv"][index]
-            * population_dynamics_dataframes[state]["Hospitalized_FV"].iloc[-1]
-            + percentage_unvaccinated_to_fully_vaccinated
-            * population_dynamics_dataframes[state]["Recovered_UV"].iloc[-1]
-            - percentage_fully_vaccinated_to_booster_vaccinated
-            * population_dynamics_dataframes[state]["Recovered_FV"].iloc[-1]
+        alpha = model_parameters[
+            ..., epidemiological_model_parameter_names.index("alpha")
+        ]
+        sigma_s, sigma_r = rates("sigma_s"), rates("sigma_r")
+        zeta_s, zeta_r = rates("zeta_s"), rates("zeta_r")
+        delta, gamma_i, gamma_h = rates("delta"), rates("gamma_i"), rates("gamma_h")
+        mu_i, mu_h = rates("mu_i"), rates("mu_h")
+
+        infected_power = (
+            population_dynamics[..., population_dynamics_columns.index("Infected")]
+            ** alpha
+        )[..., None]
+        beta = beta[..., None]
+        state_populations = state_populations[..., None]
+
+        # Vaccination rates of the (uv -> fv, fv -> bv, bv -> none) transitions.
+        vaccination_rates = np.stack(
+            [
+                percentage_unvaccinated_to_fully_vaccinated,
+                percentage_fully_vaccinated_to_booster_vaccinated,
+                np.zeros_like(percentage_unvaccinated_to_fully_vaccinated),
+            ],
+            axis=-1,
         )
 
-        number_of_booster_vaccinated_recovered_individuals = int(
-            population_dynamics_dataframes[state]["Recovered_BV"].iloc[-1]
-            - (
-                    beta
-                    * population_dynamics_dataframes[state]["Recovered_BV"].iloc[-1]
-                    * (
-                            population_dynamics_dataframes[state]["Infected"].iloc[-1]
-                            ** epidemiological_model_parameters[state]["alpha"][index]
-                    )
-                    / state_populations[state]
-            )
-            + epidemiological_model_parameters[state]["sigma_r_bv"][index]
-            * population_dynamics_dataframes[state]["Exposed_BV"].iloc[-1]
-            + epidemiological_model_parameters[state]["gamma_i_bv"][index]
-            * population_dynamics_dataframes[state]["Infected_BV"].iloc[-1]
-            + epidemiological_model_parameters[state]["gamma_h_bv"][index]
-            * population_dynamics_dataframes[state]["Hospitalized_BV"].iloc[-1]
-            + percentage_fully_vaccinated_to_booster_vaccinated
-            * population_dynamics_dataframes[state]["Recovered_FV"].iloc[-1]
-        )
+        def vaccinations(compartment):
+            # The uv and fv groups lose "outflow" and the fv and bv groups gain "inflow". Adding or subtracting the
+            # zero entries leaves the remaining groups unchanged.
+            outflow = vaccination_rates * compartment
+            inflow = outflow[..., [2, 0, 1]]
+            return inflow, outflow
 
-        number_of_recovered_individuals = (
-                number_of_unvaccinated_recovered_individuals
-                + number_of_fully_vaccinated_recovered_individuals
-                + number_of_booster_vaccinated_recovered_individuals
-        )
+        susceptible_exposures = beta * susceptible * infected_power / state_populations
+        recovered_exposures = beta * recovered * infected_power / state_populations
 
-        # Deceased Compartment
-        number_of_unvaccinated_deceased_individuals = int(
-            population_dynamics_dataframes[state]["Deceased_UV"].iloc[-1]
-            + epidemiological_model_parameters[state]["mu_i_uv"][index]
-            * population_dynamics_dataframes[state]["Infected_UV"].iloc[-1]
-            + epidemiological_model_parameters[state]["mu_h_uv"][index]
-            * population_dynamics_dataframes[state]["Hospitalized_UV"].iloc[-1]
+        # sigma_s_uv multiplies the unvaccinated susceptible individuals, while sigma_s_fv and sigma_s_bv multiply the
+        # fully vaccinated and booster vaccinated exposed individuals.
+        susceptible_sources = np.concatenate(
+            [susceptible[..., :1], exposed[..., 1:]], axis=-1
         )
 
-        number_of_fully_vaccinated_deceased_individuals = int(
-            population_dynamics_dataframes[state]["Deceased_FV"].iloc[-1]
-            + epidemiological_model_parameters[state]["mu_i_fv"][index]
-            * population_dynamics_dataframes[state]["Infected_FV"].iloc[-1]
-            + epidemiological_model_parameters[state]["mu_h_fv"][index]
-            * population_dynamics_dataframes[state]["Hospitalized_FV"].iloc[-1]
+        inflow, outflow = vaccinations(susceptible)
+        next_susceptible = np.trunc(
+            susceptible
+            - susceptible_exposures
+            + sigma_s * susceptible_sources
+            + inflow
+            - outflow
         )
 
-        number_of_booster_vaccinated_deceased_individuals = int(
-            population_dynamics_dataframes[state]["Deceased_BV"].iloc[-1]
-            + epidemiological_model_parameters[state]["mu_i_bv"][index]
-            * population_dynamics_dataframes[state]["Infected_BV"].iloc[-1]
-            + epidemiological_model_parameters[state]["mu_h_bv"][index]
-            * population_dynamics_dataframes[state]["Hospitalized_BV"].iloc[-1]
+        inflow, outflow = vaccinations(exposed)
+        next_exposed = np.trunc(
+            exposed
+            + susceptible_exposures
+            + recovered_exposures
+            - zeta_s * exposed
+            - zeta_r * exposed
+            - sigma_s * exposed
+            - sigma_r * exposed
+            + inflow
+            - outflow
         )
 
-        number_of_deceased_individuals = (
-                number_of_unvaccinated_deceased_individuals
-                + number_of_fully_vaccinated_deceased_individuals
-                + number_of_booster_vaccinated_deceased_individuals
+        next_infected = np.trunc(
+            infected
+            + zeta_s * exposed
+            + zeta_r * exposed
+            - delta * infected
+            - gamma_i * infected
+            - mu_i * infected
         )
 
-        # Population Dynamics by Vaccination Status
-        number_of_unvaccinated_individuals = int(
-            population_dynamics_dataframes[state]["unvaccinated_individuals"].iloc[-1]
-            - percentage_unvaccinated_to_fully_vaccinated
-            * population_dynamics_dataframes[state]["unvaccinated_individuals"].iloc[-1]
+        new_infections = zeta_s * exposed
+        new_reinfections = zeta_r * exposed
+        new_cases = np.trunc(
+            new_infections[..., 0]
+            + new_reinfections[..., 0]
+            + new_infections[..., 1]
+            + new_reinfections[..., 1]
+            + new_infections[..., 2]
+            + new_reinfections[..., 2]
         )
 
-        number_of_fully_vaccinated_individuals = int(
-            population_dynamics_dataframes[state]["fully_vaccinated_individuals"].iloc[
-                -1
-            ]
-            + percentage_unvaccinated_to_fully_vaccinated
-            * population_dynamics_dataframes[state]["unvaccinated_individuals"].iloc[-1]
-            - percentage_fully_vaccinated_to_booster_vaccinated
-            * population_dynamics_dataframes[state][
-                "fully_vaccinated_individuals"
-            ].iloc[-1]
+        next_hospitalized = np.trunc(
+            hospitalized
+            + delta * infected
+            - gamma_h * hospitalized
+            - mu_h * hospitalized
         )
 
-        number_of_booster_vaccinated_individuals = int(
-            population_dynamics_dataframes[state][
-                "booster_vaccinated_individuals"
-            ].iloc[-1]
-            + percentage_fully_vaccinated_to_booster_vaccinated
-            * population_dynamics_dataframes[state][
-                "fully_vaccinated_individuals"
-            ].iloc[-1]
+        inflow, outflow = vaccinations(recovered)
+        next_recovered = np.trunc(
+            recovered
+            - recovered_exposures
+            + sigma_r * exposed
+            + gamma_i * infected
+            + gamma_h * hospitalized
+            + inflow
+            - outflow
         )
 
-        # Update
-        print(
-            "Before:\n",
-            population_dynamics_dataframes[state],
-        )
-        new_row = {
-            "date": [environment_config["simulation_start_date"]],
-            "Susceptible_UV": [number_of_unvaccinated_susceptible_individuals],
-            "Susceptible_FV": [number_of_fully_vaccinated_susceptible_individuals],
-            "Susceptible_BV": [number_of_booster_vaccinated_susceptible_individuals],
-            "Susceptible": [number_of_susceptible_individuals],
-            "Exposed_UV": [number_of_unvaccinated_exposed_individuals],
-            "Exposed_FV": [number_of_fully_vaccinated_exposed_individuals],
-            "Exposed_BV": [number_of_booster_vaccinated_exposed_individuals],
-            "Exposed": [number_of_exposed_individuals],
-            "Infected_UV": [number_of_unvaccinated_infected_individuals],
-            "Infected_FV": [number_of_fully_vaccinated_infected_individuals],
-            "Infected_BV": [number_of_booster_vaccinated_infected_individuals],
-            "Infected": [number_of_infected_individuals],
-            "Hospitalized_UV": [number_of_unvaccinated_hospitalized_individuals],
-            "Hospitalized_FV": [number_of_fully_vaccinated_hospitalized_individuals],
-            "Hospitalized_BV": [number_of_booster_vaccinated_hospitalized_individuals],
-            "Hospitalized": [number_of_hospitalized_individuals],
-            "Recovered_UV": [number_of_unvaccinated_recovered_individuals],
-            "Recovered_FV": [number_of_fully_vaccinated_recovered_individuals],
-            "Recovered_BV": [number_of_booster_vaccinated_recovered_individuals],
-            "Recovered": [number_of_recovered_individuals],
-            "Deceased_UV": [number_of_unvaccinated_deceased_individuals],
-            "Deceased_FV": [number_of_fully_vaccinated_deceased_individuals],
-            "Deceased_BV": [number_of_booster_vaccinated_deceased_individuals],
-            "Deceased": [number_of_deceased_individuals],
-            "unvaccinated_individuals": [number_of_unvaccinated_individuals],
-            "fully_vaccinated_individuals": [number_of_fully_vaccinated_individuals],
-            "booster_vaccinated_individuals": [
-                number_of_booster_vaccinated_individuals
-            ],
-        }
-        population_dynamics_dataframes[state] = pd.concat(
-            [population_dynamics_dataframes[state], pd.DataFrame(new_row)],
-            ignore_index=True,
-        )
-        print(
-            "\n\nAfter:\n",
-            population_dynamics_dataframes[state],
+        next_deceased = np.trunc(deceased + mu_i * infected + mu_h * hospitalized)
+
+        inflow, outflow = vaccinations(vaccination_status)
+        next_vaccination_status = np.trunc(vaccination_status + inflow - outflow)
+
+        next_population_dynamics = population_dynamics.copy()
+        for compartment_name, values in [
+            ("Susceptible", next_susceptible),
+            ("Exposed", next_exposed),
+            ("Infected", next_infected),
+            ("Hospitalized", next_hospitalized),
+            ("Recovered", next_recovered),
+            ("Deceased", next_deceased),
+        ]:
+            next_population_dynamics[..., column_indices(compartment_name)] = values
+            next_population_dynamics[
+                ..., population_dynamics_columns.index(compartment_name)
+            ] = values.sum(axis=-1)
+        next_population_dynamics[..., vaccination_status_indices] = (
+            next_vaccination_status
         )
 
-        return (
-            population_dynamics_dataframes,
-            new_cases,
-        )
+        return next_population_dynamics, new_cases
 
     def epidemic_forecasting(self, state):
         """This method forecasts how an epidemic will evolve."""
@@ -0,0 +1,217 @@
+import numpy as np
+import pandas as pd
+
+# Columns of the population dynamics (in the order used by ParameterInitializer.initialize_population_dynamics).
+population_dynamics_columns = [
+    "unvaccinated_individuals",
+    "fully_vaccinated_individuals",
+    "booster_vaccinated_individuals",
+    "Susceptible",
+    "Exposed",
+    "Infected",
+    "Hospitalized",
+    "Recovered",
+    "Deceased",
+    "Susceptible_UV",
+    "Susceptible_FV",
+    "Susceptible_BV",
+    "Exposed_UV",
+    "Exposed_FV",
+    "Exposed_BV",
+    "Infected_UV",
+    "Infected_FV",
+    "Infected_BV",
+    "Hospitalized_UV",
+    "Hospitalized_FV",
+    "Hospitalized_BV",
+    "Recovered_UV",
+    "Recovered_FV",
+    "Recovered_BV",
+    "Deceased_UV",
+    "Deceased_FV",
+    "Deceased_BV",
+    "Economic and Public Perception Rate",
+]
+
+
+class PopulationDynamicsColumn:
+    """This class provides a named column of the population dynamics of a state. It supports the
+    ".iloc[position]" reads and writes of a DataFrame column without copying the data.
+    """
+
+    def __init__(self, population_dynamics_store, state_index, column_index):
+        """This method initializes the required variables.
+
+        :param population_dynamics_store: PopulationDynamicsStore holding the data.
+        :param state_index: Integer - Index of the state in the store.
+        :param column_index: Integer - Index of the column in the store."""
+
+        self.population_dynamics_store = population_dynamics_store
+        self.state_index = state_index
+        self.column_index = column_index
+
+    @property
+    def values(self):
+        """This method returns a view of the column values recorded so far."""
+
+        return self.population_dynamics_store.data[
+            self.state_index,
+            : self.population_dynamics_store.lengths[self.state_index],
+            self.column_index,
+        ]
+
+    @property
+    def iloc(self):
+        """This method returns a view of the column values that can be indexed by position."""
+
+        return self.values
+
+    def __len__(self):
+        return int(self.population_dynamics_store.lengths[self.state_index])
+
+
+class StatePopulationDynamics:
+    """This class provides the named-column view of the population dynamics of a single state."""
+
+    def __init__(self, population_dynamics_store, state_index):
+        """This method initializes the required variables.
+
+        :param population_dynamics_store: PopulationDynamicsStore holding the data.
+        :param state_index: Integer - Index of the state in the store."""
+
+        self.population_dynamics_store = population_dynamics_store
+        self.state_index = state_index
+
+    def __getitem__(self, column):
+        return PopulationDynamicsColumn(
+            population_dynamics_store=self.population_dynamics_store,
+            state_index=self.state_index,
+            column_index=self.population_dynamics_store.column_indices[column],
+        )
+
+    def __len__(self):
+        return int(self.population_dynamics_store.lengths[self.state_index])
+
+    def __repr__(self):
+        return repr(self.to_dataframe())
+
+    def to_dataframe(self):
+        """This method exports the population dynamics of the state as a DataFrame."""
+
+        return self.population_dynamics_store.to_dataframe(
+            self.population_dynamics_store.states[self.state_index]
+        )
+
+
+class PopulationDynamicsStore:
+    """This class stores the population dynamics of all the states in a preallocated array of shape
+    (states x timesteps x columns). Appending a timestep writes a single row instead of growing a DataFrame, and
+    DataFrames are only built when they are exported."""
+
+    def __init__(
+        self,
+        states,
+        max_timesteps,
+        simulation_start_date,
+        columns=None,
+    ):
+        """This method initializes the store.
+
+        :param states: List of the state names.
+        :param max_timesteps: Integer - Maximum number of timesteps that can be appended after the initial row.
+        :param simulation_start_date: Date of the initial row, used for the "date" column of the exported DataFrames.
+        :param columns: List of the column names. Defaults to the population dynamics columns.
+        """
+
+        self.states = list(states)
+        self.state_indices = {state: index for index, state in enumerate(self.states)}
+        self.columns = list(population_dynamics_columns if columns is None else columns)
+        self.column_indices = {
+            column: index for index, column in enumerate(self.columns)
+        }
+        self.max_timesteps = max_timesteps
+        self.simulation_start_date = simulation_start_date
+
+        self.data = np.full(
+            (len(self.states), max_timesteps + 1, len(self.columns)), np.nan
+        )
+        self.lengths = np.zeros(len(self.states), dtype=int)
+
+    def initialize_rows(self, rows):
+        """This method clears the store and writes the initial row of every state. Only the initial rows are written,
+        since the rows after the recorded timesteps are never read.
+
+        :param rows: Array (states, columns) - Initial rows, in the order of the states.
+        """
+
+        self.data[:, 0] = rows
+        self.lengths.fill(1)
+
+    def append_rows(self, rows):
+        """This method appends a row to the population dynamics of every state.
+
+        :param rows: Array (states, columns) - Rows to append, in the order of the states.
+        """
+
+        if self.lengths.max() > self.max_timesteps:
+            raise IndexError(
+                f"The population dynamics already hold {self.max_timesteps} timesteps."
+            )
+
+        self.data[np.arange(len(self.states)), self.lengths] = rows
+        self.lengths += 1
+
+    def current(self):
+        """This method returns a copy of the most recent row of every state as an array of shape (states, columns)."""
+
+        return self.data[np.arange(len(self.states)), self.lengths - 1]
+
+    def rewind(self, lengths, rows):
+        """This method sets the number of recorded timesteps of every state and rewrites their most recent rows. The
+        rows recorded before are kept as they are.
+
+        :param lengths: Array (states) - Number of recorded timesteps of every state.
+        :param rows: Array (states, columns) - Most recent rows, in the order of the states.
+        """
+
+        self.lengths[:] = lengths
+        self.data[np.arange(len(self.states)), self.lengths - 1] = rows
+
+    def __getitem__(self, state):
+        return StatePopulationDynamics(
+            population_dynamics_store=self, state_index=self.state_indices[state]
+        )
+
+    def __contains__(self, state):
+        return state in self.state_indices
+
+    def __iter__(self):
+        return iter(self.states)
+
+    def __len__(self):
+        return len(self.states)
+
+    def to_dataframe(self, state):
+        """This method exports the population dynamics of a state as a DataFrame.
+
+        :param state: String - Name of the state."""
+
+        state_index = self.state_indices[state]
+        length = self.lengths[state_index]
+
+        dataframe = pd.DataFrame(
+            self.data[state_index, :length].copy(), columns=self.columns
+        )
+        dataframe.insert(
+            0,
+            "date",
+            pd.to_datetime(self.simulation_start_date)
+            + pd.to_timedelta(np.arange(length), unit="D"),
+        )
+
+        return dataframe
+
+    def to_dataframes(self):
+        """This method exports the population dynamics of all the states as a dictionary of DataFrames."""
+
+        return {state: self.to_dataframe(state) for state in self.states}
@@ -0,0 +1,228 @@
+import numpy as np
+from src.epidemic_simulation_environment.action_legality_computer import (
+    ActionLegalityComputer,
+    minimum_action_periods,
+    maximum_action_periods,
+)
+from src.epidemic_simulation_environment.population_dynamics_computer import (
+    PopulationDynamicsComputer,
+    epidemiological_model_parameter_names,
+)
+from src.epidemic_simulation_environment.population_dynamics_store import (
+    population_dynamics_columns,
+)
+
+
+class SimulationStepComputer:
+    """This class computes a timestep of any number of episodes: the effects of the actions, the noisy exposure rates
+    and model parameters, and the population dynamics. It is shared by EpidemicSimulationMA (one episode per state)
+    and EpidemicSimulationVecEnv (any number of episodes per state)."""
+
+    # Day of the epidemiological model data at timestep 0 (october), and length of the splits of the model
+    # parameters (4 weeks).
+    start_day = 214
+    split_days = 28
+    standard_deviation = 0.05
+
+    def __init__(self, epidemiological_model_arrays, action_effects):
+        """This method initializes the computer.
+
+        :param epidemiological_model_arrays: Dictionary of the read-only arrays of the states returned by
+                                             ParameterInitializer.initialize_shared_epidemiological_model_arrays.
+        :param action_effects: Dictionary returned by ParameterInitializer.initialize_action_effects."""
+
+        self.beta_values = epidemiological_model_arrays["beta"]
+        self.epidemiological_model_parameter_values = epidemiological_model_arrays[
+            "epidemiological_model_parameters"
+        ]
+        self.percentages_unvaccinated_to_fully_vaccinated = (
+            epidemiological_model_arrays["percentages_unvaccinated_to_fully_vaccinated"]
+        )
+        self.percentages_fully_vaccinated_to_booster_vaccinated = (
+            epidemiological_model_arrays[
+                "percentages_fully_vaccinated_to_booster_vaccinated"
+            ]
+        )
+        self.action_effects = action_effects
+
+        self.infected_column = population_dynamics_columns.index("Infected")
+        self.economic_and_public_perception_rate_column = (
+            population_dynamics_columns.index("Economic and Public Perception Rate")
+        )
+
+    def __call__(
+        self,
+        population_dynamics,
+        actions,
+        action_counters,
+        model_parameter_values,
+        model_parameter_splits,
+        noise,
+        timesteps,
+        state_indices,
+        state_populations,
+        telemetry,
+    ):
+        """This method computes the next timestep of the episodes.
+
+        :param population_dynamics: Array (episodes x columns) - Population dynamics of the current timestep.
+        :param actions: Array (episodes) - Actions taken in the episodes.
+        :param action_counters: Array (episodes x 5) - Consecutive timesteps for which each isolated action was taken.
+        :param model_parameter_values: Array (episodes x parameters) - Noisy model parameters of the previous
+                                       timestep, perturbed further at every timestep of a split.
+        :param model_parameter_splits: Array (episodes) - Splits of the model_parameter_values. The episodes whose
+                                       split changes (e.g., -1 at the start of an episode) start from the baselines.
+        :param noise: Array (episodes x (1 + parameters)) - Standard normal noise of the exposure rates (first) and
+                      the model parameters.
+        :param timesteps: Integer or array (episodes) - Timesteps of the episodes.
+        :param state_indices: Array (episodes) - Index of the state simulated by each episode.
+        :param state_populations: Array (episodes) - Populations of the simulated states.
+        :param telemetry: StepTelemetry timing the "action_effects" and "dynamics" phases.
+
+        :returns population_dynamics: Array (episodes x columns) - Population dynamics of the next timestep.
+                 new_cases: Array (episodes) - Number of new cases.
+                 action_counters: Array (episodes x 5) - Updated action counters.
+                 model_parameter_values: Array (episodes x parameters) - Noisy model parameters of the timestep.
+                 model_parameter_splits: Array (episodes) - Splits of the model_parameter_values."""
+
+        if telemetry.enabled:
+            phase_start = telemetry.start()
+
+        # This index helps to use the different parameter values for the different splits.
+        splits = np.broadcast_to(
+            (timesteps + self.start_day) // self.split_days, state_indices.shape
+        )
+        days = timesteps + self.start_day
+
+        # Updating the action dependent parameters:
+        low_infection = (
+            population_dynamics[:, self.infected_column] / state_populations
+            < self.action_effects["infection_threshold"]
+        ).astype(int)
+
+        betas = (
+            self.beta_values[state_indices, splits]
+            * self.action_effects["beta_multipliers"][actions, low_infection]
+        )
+        economic_and_public_perception_rates = np.minimum(
+            population_dynamics[:, self.economic_and_public_perception_rate_column]
+            * self.action_effects["economic_and_public_perception_multipliers"][
+                actions, low_infection
+            ],
+            100,
+        )
+
+        # The counters of the actions that are taken are incremented and the others are reset.
+        action_counters = (action_counters + 1) * self.action_effects[
+            "counter_increments"
+        ][actions]
+
+        # Action dependent vaccination rates.
+        action_vaccination_rates = self.action_effects[
+            "percentages_unvaccinated_to_fully_vaccinated"
+        ][actions]
+        percentages_unvaccinated_to_fully_vaccinated = np.where(
+            np.isnan(action_vaccination_rates),
+            self.percentages_unvaccinated_to_fully_vaccinated[state_indices, days],
+            action_vaccination_rates,
+        )
+        percentages_fully_vaccinated_to_booster_vaccinated = (
+            self.percentages_fully_vaccinated_to_booster_vaccinated[state_indices, days]
+        )
+
+        # Noisy exposure rates and model parameters (beta first).
+        model_parameter_values = np.where(
+            (model_parameter_splits != splits)[:, np.newaxis],
+            self.epidemiological_model_parameter_values[state_indices, :, splits],
+            model_parameter_values,
+        )
+        mu = np.column_stack([betas, model_parameter_values])
+        noisy_model_parameters = mu + self.standard_deviation * mu * noise
+
+        if telemetry.enabled:
+            phase_start = telemetry.lap("action_effects", phase_start)
+
+        (
+            population_dynamics,
+            new_cases,
+        ) = PopulationDynamicsComputer.compute_vectorized_population_dynamics(
+            population_dynamics=population_dynamics,
+            beta=noisy_model_parameters[:, 0],
+            model_parameters=noisy_model_parameters[:, 1:],
+            percentage_unvaccinated_to_fully_vaccinated=percentages_unvaccinated_to_fully_vaccinated,
+            percentage_fully_vaccinated_to_booster_vaccinated=percentages_fully_vaccinated_to_booster_vaccinated,
+            state_populations=state_populations,
+        )
+        population_dynamics[
+            :, self.economic_and_public_perception_rate_column
+        ] = economic_and_public_perception_rates
+
+        if telemetry.enabled:
+            telemetry.lap("dynamics", phase_start)
+
+        return (
+            population_dynamics,
+            new_cases,
+            action_counters,
+            noisy_model_parameters[:, 1:],
+            splits.copy(),
+        )
+
+    def rewards(self, population_dynamics, state_populations, infection_coefficient):
+        """This method computes the rewards of the episodes from their population dynamics.
+
+        :param population_dynamics: Array (episodes x columns) - Population dynamics of the timestep.
+        :param state_populations: Array (episodes) - Populations of the simulated states.
+        :param infection_coefficient: Float - Weight of the infected fraction of the population."""
+
+        return (
+            -infection_coefficient
+            * population_dynamics[:, self.infected_column]
+            / state_populations
+            + population_dynamics[:, self.economic_and_public_perception_rate_column]
+        )
+
+
+def initialize_simulation(parameter_initializer, states, env_config, number_of_actions):
+    """This function initializes the read-only objects shared by EpidemicSimulationMA and EpidemicSimulationVecEnv to
+    simulate the states. The epidemiological model data of the parameter_initializer must be initialized first.
+
+    :param parameter_initializer: ParameterInitializer of the environment.
+    :param states: List of the names of the simulated states.
+    :param env_config: Dictionary containing the configuration of the environment ("action_effects" optionally
+                       overrides the effects of the actions).
+    :param number_of_actions: Integer - Size of the action space.
+
+    :returns epidemiological_model_arrays: Dictionary of the arrays of the states (in the order of states) returned by
+                                           ParameterInitializer.initialize_shared_epidemiological_model_arrays.
+             action_effects: Dictionary returned by ParameterInitializer.initialize_action_effects.
+             action_legality_computer: ActionLegalityComputer of the minimum and maximum action periods.
+             simulation_step_computer: SimulationStepComputer of the states."""
+
+    epidemiological_model_arrays = (
+        parameter_initializer.initialize_shared_epidemiological_model_arrays(
+            states=states,
+            epidemiological_model_parameter_names=epidemiological_model_parameter_names,
+        )
+    )
+    # Effects of the actions on beta, the economic and public perception rate, the action counters and the
+    # vaccination rates.
+    action_effects = parameter_initializer.initialize_action_effects(
+        action_effects_config=env_config.get("action_effects")
+    )
+    action_legality_computer = ActionLegalityComputer(
+        min_periods=minimum_action_periods,
+        max_periods=maximum_action_periods,
+        number_of_actions=number_of_actions,
+    )
+    simulation_step_computer = SimulationStepComputer(
+        epidemiological_model_arrays=epidemiological_model_arrays,
+        action_effects=action_effects,
+    )
+
+    return (
+        epidemiological_model_arrays,
+        action_effects,
+        action_legality_computer,
+        simulation_step_computer,
+    )
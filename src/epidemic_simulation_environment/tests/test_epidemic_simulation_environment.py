@@ -0,0 +1,68 @@
+import unittest
+from src.settings import data_directory
+from src.epidemic_simulation_environment.epidemic_simulation_environment import (
+    EpidemicSimulationMA,
+)
+
+environment_configuration = {
+    "data_path": f"{data_directory}/epidemiological_model_data/",
+    "simulation_start_date": "11/01/2021",
+}
+
+
+def actions(timestep, branch=0):
+    """This function chooses different actions for the states at every timestep, and for every branch."""
+
+    return [(timestep + branch) % 12, (3 * timestep + branch) % 12]
+
+
+class EpidemicSimulationMATestCase(unittest.TestCase):
+    def setUp(self):
+        self.environment = EpidemicSimulationMA(env_config=environment_configuration)
+
+    def run_episode(self, environment, timesteps, seed):
+        environment.reset(seed=seed)
+        return [
+            environment.step(actions(timestep))[:2] for timestep in range(timesteps)
+        ]
+
+    def test_seeded_episodes_reproduce(self):
+        other_environment = EpidemicSimulationMA(env_config=environment_configuration)
+        self.assertEqual(
+            repr(self.run_episode(self.environment, 20, seed=7)),
+            repr(self.run_episode(other_environment, 20, seed=7)),
+        )
+        self.assertNotEqual(
+            repr(self.run_episode(self.environment, 20, seed=7)),
+            repr(self.run_episode(other_environment, 20, seed=8)),
+        )
+
+    def test_restored_snapshots_branch(self):
+        environment = self.environment
+        environment.reset(seed=3)
+        snapshots = {}
+        for timestep in range(10):
+            if timestep == 5:
+                snapshots[5] = environment.get_snapshot()
+            environment.step(actions(timestep))
+        snapshots[10] = environment.get_snapshot()
+        expected = [
+            environment.step(actions(timestep))[:2] for timestep in range(10, 13)
+        ]
+
+        # Another branch from timestep 5, shorter than the snapshot of timestep 10.
+        environment.restore_snapshot(snapshots[5])
+        for timestep in range(5, 7):
+            environment.step(actions(timestep, branch=1))
+
+        environment.restore_snapshot(snapshots[10])
+        self.assertEqual(
+            repr(
+                [environment.step(actions(timestep))[:2] for timestep in range(10, 13)]
+            ),
+            repr(expected),
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
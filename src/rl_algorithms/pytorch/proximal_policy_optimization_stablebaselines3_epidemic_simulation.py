@@ -1,42 +1,19 @@
-import sys
-
-from stable_baselines3.common.vec_env import DummyVecEnv, VecFrameStack, SubprocVecEnv
-from src.epidemic_simulation_environment.epidemic_simulation_environment import EpidemicSimulation
+from stable_baselines3.common.vec_env import VecFrameStack, VecMonitor
+from src.epidemic_simulation_environment.epidemic_simulation_vector_environment import EpidemicSimulationVecEnv
+from src.epidemic_simulation_environment.epidemic_simulation_sb3_vector_environment import EpidemicSimulationSB3VecEnv
+from src.settings import data_directory
 import stable_baselines3
-from stable_baselines3.common.env_checker import check_env
-import gymnasium as gym
-import numpy as np
-from gymnasium import spaces
 import time
-from stable_baselines3.common.monitor import Monitor
 from sb3_contrib import RecurrentPPO
 
-environment_configuration = {'data_path': f"../../../Data/Updated Data/epidemiological_model_data/",
-                             'state_name': 'new_york', 'state_population': 19_453_734, 'start_date': '11/01/2021'}
-
-
-def create_env():
-    env = EpidemicSimulation(env_config=environment_configuration)
-
-    class SB3Observation(gym.ObservationWrapper):
-        def __init__(self, env):
-            super().__init__(env)
-            self.observation_space = spaces.Box(
-                low=-np.inf, high=np.inf, shape=(4,), dtype=np.float64
-            )
-
-        def observation(self, obs):
-            return np.array(obs)
-
-    env = SB3Observation(env)
-    env = Monitor(env)
-    return env
+environment_configuration = {'data_path': f"{data_directory}/epidemiological_model_data/",
+                             'simulation_start_date': '11/01/2021', 'states': ['New York']}
 
 
 if __name__ == "__main__":
-    check_env(create_env())
-
-    env = SubprocVecEnv([create_env] * 32, start_method="spawn")
+    # The 32 episodes are simulated as arrays in this process.
+    env = EpidemicSimulationSB3VecEnv(EpidemicSimulationVecEnv(env_config=environment_configuration, num_envs=32))
+    env = VecMonitor(env)
     env = VecFrameStack(env, n_stack=14)
     print(env.reset().shape)
 
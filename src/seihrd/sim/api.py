@@ -1,27 +1,57 @@
-from fastapi import FastAPI, WebSocket
-from seihrd.sim.seihrd_env import SeihrdEnv
+import os
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, WebSocket, WebSocketDisconnect
+from seihrd.sim.rooms import RoomRegistry, error_message
+from seihrd.sim.sessions import SessionRegistry, SessionLimitError, SessionClosedError
 
+MAX_SESSIONS = int(os.environ.get('SEIHRD_MAX_SESSIONS', 64))
+MAX_WORKERS = int(os.environ.get('SEIHRD_MAX_WORKERS', min(8, os.cpu_count() or 1)))
+ENV_POOL_SIZE = int(os.environ.get('SEIHRD_ENV_POOL_SIZE', min(16, MAX_SESSIONS)))
 
-app = FastAPI()
+registry = SessionRegistry(max_sessions=MAX_SESSIONS, max_workers=MAX_WORKERS, pool_size=ENV_POOL_SIZE)
+rooms = RoomRegistry(registry)
+
+
+@asynccontextmanager
+async def lifespan(_app: FastAPI):
+    await registry.warm()
+    yield
+    registry.shutdown()
+
+
+app = FastAPI(lifespan=lifespan)
 
 
 @app.websocket_route("/ws")
 async def websocket_endpoint(websocket: WebSocket):
+    """
+    Clients connecting with ?protocol=binary receive the static fields of the session once as JSON and then binary
+    delta frames (see seihrd.sim.frames) instead of the full state as JSON on every step.
+    Clients connecting with ?room=name share the simulation of that room (see seihrd.sim.rooms): a new member first
+    receives the current state and a {'type': 'room', 'driver': bool} message. Only the driver, the first member, can
+    send the messages below, and every member receives the frames of its steps and runs.
+    The client messages are:
+        {'type': 'step', 'action': [...]}: steps the simulation once.
+        {'type': 'run', 'steps': n, 'actions': [[...], ...] or 'policy': name, 'rate': frames per second,
+         'credits': k}: streams up to n steps, sending a frame only while the client has credits. It starts with k
+         credits and ends with a 'run_end' message.
+        {'type': 'credit', 'credits': k}: grants k more frames to the running stream.
+        {'type': 'stop'}: ends the running stream.
+    """
+    binary = websocket.query_params.get('protocol') == 'binary'
     await websocket.accept()
     print('accepted')
-    env = SeihrdEnv()
-    env.reset()
-    await websocket.send_json({
-        'type': 'next_state',
-        'state': env.get_state_dict(),
-        'error': None,
-    })
-    while True:
-        data = await websocket.receive_json()
-        action = data['action']
-        env.step(action)
-        await websocket.send_json({
-            'type': 'next_state',
-            'state': env.get_state_dict(),
-            'error': None,
-        })
+    try:
+        room = await rooms.join(websocket.query_params.get('room'), websocket, binary)
+    except (SessionLimitError, SessionClosedError) as e:
+        await websocket.send_json(error_message(str(e)))
+        await websocket.close(code=1013)  # Try again later.
+        return
+
+    try:
+        while True:
+            await room.receive(websocket, await websocket.receive_json())
+    except WebSocketDisconnect:
+        pass
+    finally:
+        rooms.leave(room, websocket)
@@ -0,0 +1,126 @@
+import numpy as np
+from seihrd.sim.base_models import (
+    State,
+    Populations,
+    SubCompPopulations,
+    Params,
+    SubCompParams,
+    SimHyperParams,
+)
+
+# Rows of the population matrix (in the order of the Populations fields) and its columns.
+compartments = list(Populations.__fields__)
+c2i = {c: i for i, c in enumerate(compartments)}
+sub_compartments = ['uv', 'fv', 'b']
+
+# Layout of the parameter vector: the scalar params (vfv, vb, alpha, beta) followed by the uv, fv and b values of each
+# sub-compartment param, in the order of the Params fields.
+scalar_params = [f for f, field in Params.__fields__.items() if field.type_ is float]
+sub_comp_params = [f for f, field in Params.__fields__.items() if field.type_ is SubCompParams]
+p2i = {p: i for i, p in enumerate(scalar_params)}
+for _i, _p in enumerate(sub_comp_params):
+    p2i[_p] = slice(len(scalar_params) + 3 * _i, len(scalar_params) + 3 * _i + 3)
+n_params = len(scalar_params) + 3 * len(sub_comp_params)
+
+
+class ArrayState:
+    """
+    Array-backed simulation state. The transitions update its arrays in place:
+        populations: (6, 3) int matrix, rows in `compartments` order, columns uv, fv, b.
+        params: (31,) float vector laid out as described by `p2i`.
+        action_in_effect, action_cool_down, action_mask: (4,) int vectors.
+    The pydantic `State` is only built on demand by `to_state`.
+    A batch of N simulations (see `tile`) has a leading N dimension on every array, and epp, time_step and is_done are
+    (N,) arrays. The hyper parameters are shared by the batch.
+    """
+
+    array_fields = [
+        'populations', 'params', 'epp', 'action_in_effect', 'action_cool_down', 'action_mask', 'time_step', 'is_done',
+    ]
+
+    def __init__(
+            self,
+            populations: np.ndarray,
+            params: np.ndarray,
+            epp: float,
+            hyper_parameters: SimHyperParams,
+            action_in_effect: np.ndarray,
+            action_cool_down: np.ndarray,
+            action_mask: np.ndarray,
+            time_step: int,
+            is_done: bool,
+    ):
+        self.populations = populations
+        self.params = params
+        self.epp = epp
+        self.hyper_parameters = hyper_parameters
+        self.action_in_effect = action_in_effect
+        self.action_cool_down = action_cool_down
+        self.action_mask = action_mask
+        self.time_step = time_step
+        self.is_done = is_done
+
+    @classmethod
+    def from_state(cls, state: State):
+        params = np.zeros(n_params)
+        for p in scalar_params:
+            params[p2i[p]] = state.params[p]
+        for p in sub_comp_params:
+            params[p2i[p]] = [state.params[p][c] for c in sub_compartments]
+
+        return cls(
+            populations=np.array(state.populations.to_list(), dtype=np.int64),
+            params=params,
+            epp=state.epp,
+            hyper_parameters=state.hyper_parameters.copy(deep=True),
+            action_in_effect=np.array(state.action_in_effect, dtype=np.int64),
+            action_cool_down=np.array(state.action_cool_down, dtype=np.int64),
+            action_mask=np.array(state.action_mask, dtype=np.int64),
+            time_step=state.time_step,
+            is_done=state.is_done,
+        )
+
+    def to_state(self) -> State:
+        params = {p: float(self.params[p2i[p]]) for p in scalar_params}
+        for p in sub_comp_params:
+            params[p] = SubCompParams(**dict(zip(sub_compartments, self.params[p2i[p]].tolist())))
+
+        return State(
+            populations=Populations(**{
+                c: SubCompPopulations(**dict(zip(sub_compartments, self.populations[i].tolist())))
+                for i, c in enumerate(compartments)
+            }),
+            params=Params(**params),
+            epp=float(self.epp),
+            hyper_parameters=self.hyper_parameters.copy(deep=True),
+            action_in_effect=self.action_in_effect.tolist(),
+            action_cool_down=self.action_cool_down.tolist(),
+            action_mask=self.action_mask.tolist(),
+            time_step=self.time_step,
+            is_done=bool(self.is_done),
+        )
+
+    def tile(self, n: int):
+        """
+        Batch of n copies of this state.
+        """
+        return ArrayState(
+            hyper_parameters=self.hyper_parameters,
+            **{f: np.repeat(np.asarray(getattr(self, f))[None], n, axis=0) for f in self.array_fields}
+        )
+
+    def assign(self, rows, state):
+        """
+        Overwrites the given rows of this batch with a single state, e.g. to reset the simulations that are done.
+        """
+        for f in self.array_fields:
+            getattr(self, f)[rows] = getattr(state, f)
+
+    def copy(self):
+        def copy_field(value):
+            return value.copy() if isinstance(value, np.ndarray) else value
+
+        return ArrayState(
+            hyper_parameters=self.hyper_parameters.copy(deep=True),
+            **{f: copy_field(getattr(self, f)) for f in self.array_fields}
+        )
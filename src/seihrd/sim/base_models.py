@@ -1,5 +1,4 @@
 from typing import Sequence
-from numpy.random import normal
 from pydantic import BaseModel
 
 
@@ -62,20 +61,11 @@ class Populations(BaseModel, DictLike):
         return [[self[f].uv, self[f].fv, self[f].b] for f in self.__fields__]
 
 
-def noisy(param):
-    return normal(param, param * 0.05, 1)
-
-
 class SubCompParams(BaseModel, DictLike):
     uv: float = 0
     fv: float = 0
     b: float = 0
 
-    def noisy(self):
-        self.uv = noisy(self.uv)
-        self.fv = noisy(self.fv)
-        self.b = noisy(self.b)
-
 
 class Params(BaseModel, DictLike):
     vfv: float
@@ -92,13 +82,6 @@ class Params(BaseModel, DictLike):
     h_d: SubCompParams  # mu_h
     e_r: SubCompParams  # sigma_r
 
-    def noisy(self):
-        for f in self.__fields__:
-            if isinstance(self[f], SubCompParams):
-                self[f].noisy()
-            else:
-                self[f] = noisy(self[f])
-
 
 class State(BaseModel):
     populations: Populations
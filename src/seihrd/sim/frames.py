@@ -0,0 +1,83 @@
+"""
+Binary state frames of the websocket API.
+
+The static fields of a session (the layout of the values and the hyper parameters) are sent once as JSON. Every
+state is then sent as a little-endian binary frame:
+    uint8 frame type (1 = state), uint8 is_done, uint16 number of values, uint32 time_step,
+    uint32 x 2 bitmask of the values in the frame (bit i of the first word is value i, of the second value 32 + i),
+    int32 values of the integer fields in the frame, then float32 values of the float fields in the frame.
+The values are those of `layout['ints']` followed by `layout['floats']`. Only the values that changed since the
+previous frame of the session are sent, so the first frame holds all of them.
+"""
+
+import struct
+import numpy as np
+from seihrd.sim.array_state import ArrayState, compartments, sub_compartments, scalar_params, sub_comp_params
+from seihrd.sim.base_models import i2a
+
+STATE_FRAME = 1
+header = struct.Struct('<BBHIII')
+
+int_fields = (
+    [f'populations.{c}.{sc}' for c in compartments for sc in sub_compartments]
+    + [f'action_in_effect.{i}' for i in range(len(i2a))]
+    + [f'action_cool_down.{i}' for i in range(len(i2a))]
+    + [f'action_mask.{i}' for i in range(len(i2a))]
+)
+float_fields = (
+    [f'params.{p}' for p in scalar_params]
+    + [f'params.{p}.{sc}' for p in sub_comp_params for sc in sub_compartments]
+    + ['epp']
+)
+layout = {'ints': int_fields, 'floats': float_fields}
+# Frames describe the values with a 64 bit mask.
+assert len(int_fields) + len(float_fields) <= 64
+
+
+class FrameEncoder:
+    """
+    Encodes the states of a session as binary frames, keeping the values of the previous frame to send only the
+    changes.
+    """
+
+    def __init__(self):
+        self.previous_ints = None
+        self.previous_floats = None
+
+    @staticmethod
+    def static_message(state: ArrayState):
+        return {
+            'type': 'session',
+            'protocol': 'binary',
+            'layout': layout,
+            'hyper_parameters': state.hyper_parameters.dict(),
+            'error': None,
+        }
+
+    def encode(self, state: ArrayState) -> bytes:
+        s = state
+        ints = np.concatenate((
+            s.populations.reshape(-1), s.action_in_effect, s.action_cool_down, s.action_mask,
+        )).astype('<i4')
+        # The params vector is laid out as scalar_params followed by sub_comp_params, like float_fields.
+        floats = np.append(s.params, s.epp).astype('<f4')
+
+        if self.previous_ints is None:
+            changed_ints = np.ones(len(ints), dtype=bool)
+            changed_floats = np.ones(len(floats), dtype=bool)
+        else:
+            changed_ints = ints != self.previous_ints
+            # Compare the bits, so NaNs that stay NaNs are not sent again.
+            changed_floats = floats.view('<u4') != self.previous_floats.view('<u4')
+        self.previous_ints = ints
+        self.previous_floats = floats
+
+        changed = np.concatenate((changed_ints, changed_floats))
+        mask = int((changed.astype(np.uint64) << np.arange(len(changed), dtype=np.uint64)).sum())
+        return b''.join((
+            header.pack(
+                STATE_FRAME, bool(s.is_done), len(changed), s.time_step, mask & 0xFFFFFFFF, mask >> 32,
+            ),
+            ints[changed_ints].tobytes(),
+            floats[changed_floats].tobytes(),
+        ))
@@ -0,0 +1,254 @@
+import asyncio
+import json
+from typing import Dict, Optional
+from fastapi import WebSocket
+from seihrd.sim.frames import FrameEncoder
+from seihrd.sim.seihrd_env import SeihrdEnv
+from seihrd.sim.sessions import Session, SessionRegistry, SessionClosedError
+from seihrd.sim.streaming import StepStream, parse_actions
+
+
+def state_message(env: SeihrdEnv):
+    return {
+        'type': 'next_state',
+        'state': env.get_state_dict(),
+        'error': None,
+    }
+
+
+def error_message(error: str):
+    return {
+        'type': 'error',
+        'state': None,
+        'error': error,
+    }
+
+
+def dumps(message: dict) -> str:
+    # Same encoding as WebSocket.send_json.
+    return json.dumps(message, separators=(',', ':'), ensure_ascii=False)
+
+
+class Frame:
+    """
+    A state encoded once for all the members of a room: as a binary delta frame, and as JSON text if some members
+    use the JSON protocol.
+    """
+
+    def __init__(self, binary: bytes, text: Optional[str]):
+        self.binary = binary
+        self.text = text
+
+
+class Member:
+    def __init__(self, websocket: WebSocket, binary: bool):
+        self.websocket = websocket
+        self.binary = binary
+        # The broadcasts and the replies to the member can be sent at the same time.
+        self.lock = asyncio.Lock()
+
+    async def send(self, payload):
+        async with self.lock:
+            if isinstance(payload, bytes):
+                await self.websocket.send_bytes(payload)
+            else:
+                await self.websocket.send_text(payload)
+
+
+class Room:
+    """
+    A simulation shared by the websocket clients that joined it. The first member drives the room: only its steps and
+    runs advance the simulation, and the other members watch. When the driver leaves, the oldest remaining member
+    takes over. Every frame is encoded once and sent to all the members, and members that join late first receive
+    the current state.
+    Computing a frame and sending it happen under the lock of the room, so the members receive the frames in order and
+    a late member never misses the frame following its snapshot.
+    """
+
+    def __init__(self, name: Optional[str], registry: SessionRegistry):
+        self.name = name
+        self.registry = registry
+        self.session: Optional[Session] = None
+        self.encoder = FrameEncoder()
+        self.members: Dict[WebSocket, Member] = {}
+        self.driver: Optional[WebSocket] = None
+        self.lock = asyncio.Lock()
+        self.stream: Optional[StepStream] = None
+        self.stream_task: Optional[asyncio.Task] = None
+        self.driver_task: Optional[asyncio.Task] = None
+
+    async def open(self):
+        async with self.lock:
+            self.session = await self.registry.open()
+            await self.registry.run(self.session, self.render, False, self.start)
+
+    def close(self):
+        if self.stream_task is not None:
+            self.stream_task.cancel()
+        if self.session is not None:
+            self.registry.close(self.session)
+
+    # These run on the executor, with the env of the session.
+
+    @staticmethod
+    def start(env: SeihrdEnv):
+        env.reset()
+
+    @staticmethod
+    def advance(env: SeihrdEnv, action):
+        env.step(action)
+
+    def render(self, env: SeihrdEnv, json_members: bool, fn, *args):
+        # json_members is computed on the event loop, since the members change there.
+        fn(env, *args)
+        return Frame(
+            binary=self.encoder.encode(env.state),
+            text=dumps(state_message(env)) if json_members else None,
+        )
+
+    @staticmethod
+    def snapshot(env: SeihrdEnv, binary: bool):
+        if binary:
+            encoder = FrameEncoder()
+            return [dumps(encoder.static_message(env.state)), encoder.encode(env.state)]
+        return [dumps(state_message(env))]
+
+    # These run on the event loop.
+
+    def room_message(self, websocket: WebSocket):
+        return {'type': 'room', 'room': self.name, 'driver': websocket is self.driver, 'error': None}
+
+    async def join(self, websocket: WebSocket, binary: bool):
+        async with self.lock:
+            if self.session is None or self.session.closed:
+                raise SessionClosedError(f'The room {self.name} is closed.')
+            member = Member(websocket, binary)
+            for payload in await self.registry.run(self.session, self.snapshot, binary):
+                await member.send(payload)
+            self.members[websocket] = member
+            if self.driver is None:
+                self.driver = websocket
+            await member.send(dumps(self.room_message(websocket)))
+
+    def leave(self, websocket: WebSocket) -> bool:
+        """
+        Removes a member and returns whether the room is empty. When the driver leaves, its stream is stopped, since
+        nobody else grants its credits, and the oldest remaining member becomes the driver.
+        """
+        self.members.pop(websocket, None)
+        if websocket is self.driver:
+            if self.stream is not None:
+                self.stream.stop()
+            self.driver = next(iter(self.members), None)
+            if self.driver is not None:
+                self.driver_task = asyncio.create_task(self.notify_driver(self.driver))
+        return not self.members
+
+    async def notify_driver(self, websocket: WebSocket):
+        try:
+            await self.reply(websocket, self.room_message(websocket))
+        except Exception:
+            # The member left meanwhile.
+            pass
+
+    async def publish(self, fn, *args):
+        """
+        Runs fn(env, *args) and sends the frame of the new state to all the members.
+        """
+        async with self.lock:
+            json_members = any(not member.binary for member in self.members.values())
+            await self.broadcast(await self.registry.run(self.session, self.render, json_members, fn, *args))
+
+    async def broadcast(self, message):
+        if isinstance(message, Frame):
+            payloads = {True: message.binary, False: message.text}
+        else:
+            payloads = {True: dumps(message), False: dumps(message)}
+        # A member that fails to receive is removed when its connection closes.
+        await asyncio.gather(
+            *(member.send(payloads[member.binary]) for member in list(self.members.values())),
+            return_exceptions=True,
+        )
+
+    async def receive(self, websocket: WebSocket, data: dict):
+        """
+        Handles a message of a member (see websocket_endpoint). An invalid or failing message is answered with an error.
+        """
+        message_type = data.get('type', 'step')
+        try:
+            await self.handle(websocket, message_type, data)
+        except (KeyError, TypeError, ValueError) as e:
+            await self.reply(websocket, error_message(f'Invalid {message_type}: {e}'))
+        except Exception as e:
+            # A failing step must not close the connection and the room.
+            await self.reply(websocket, error_message(f'The {message_type} failed: {e}'))
+
+    async def handle(self, websocket: WebSocket, message_type: str, data: dict):
+        streaming = self.stream_task is not None and not self.stream_task.done()
+
+        if websocket is not self.driver:
+            await self.reply(websocket, error_message('Only the driver of the room can control the simulation.'))
+        elif message_type == 'credit':
+            if streaming:
+                self.stream.credits.grant(int(data.get('credits', 1)))
+        elif message_type == 'stop':
+            if streaming:
+                self.stream.stop()
+        elif streaming:
+            await self.reply(websocket, error_message('A run is in progress.'))
+        elif message_type == 'run':
+            self.stream = StepStream(
+                room=self,
+                steps=data['steps'],
+                actions=data.get('actions'),
+                policy=data.get('policy'),
+                rate=data.get('rate'),
+                credits=data.get('credits', 1),
+            )
+            self.stream_task = asyncio.create_task(self.stream.run())
+        elif self.session.env.state.is_done:
+            await self.reply(websocket, error_message('The episode is done.'))
+        else:
+            await self.publish(self.advance, parse_actions(data['action'], ndim=1))
+
+    async def reply(self, websocket: WebSocket, message: dict):
+        await self.members[websocket].send(dumps(message))
+
+
+class RoomRegistry:
+    """
+    The named rooms that clients can share. A client without a room name gets a private room.
+    """
+
+    def __init__(self, registry: SessionRegistry):
+        self.registry = registry
+        self.rooms: Dict[str, Room] = {}
+
+    async def join(self, name: Optional[str], websocket: WebSocket, binary: bool) -> Room:
+        room = self.rooms.get(name) if name is not None else None
+        if room is None:
+            room = Room(name, self.registry)
+            # The room is registered before it's opened, so the clients joining meanwhile wait for it.
+            if name is not None:
+                self.rooms[name] = room
+            try:
+                await room.open()
+            except Exception:
+                self.close(room)
+                raise
+
+        try:
+            await room.join(websocket, binary)
+        except Exception:
+            self.leave(room, websocket)
+            raise
+        return room
+
+    def leave(self, room: Room, websocket: WebSocket):
+        if room.leave(websocket):
+            self.close(room)
+
+    def close(self, room: Room):
+        if self.rooms.get(room.name) is room:
+            del self.rooms[room.name]
+        room.close()
@@ -12,16 +12,21 @@ from seihrd.sim.base_models import (
 )
 from random import random
 import gymnasium as gym
+from seihrd.sim.array_state import ArrayState, c2i, n_params
 from seihrd.sim.transitions.action_transitions import ActionTransitions
 from seihrd.sim.transitions.population_transitions import PopulationTransitions
-from seihrd.sim.transitions.seasonal_transitions import SeasonalTransitions
+from seihrd.sim.transitions.seasonal_transitions import (
+    SeasonalTransitions,
+    DEFAULT_LOCATION_FILE,
+    DEFAULT_START_OFFSET,
+)
 
 
 class SeihrdEnv(gym.Env):
     metadata = {'render.modes': ['ansi', 'human']}
     reward_range = (-np.inf, np.inf)
     action_space = gym.spaces.MultiDiscrete([2, 2, 2, 2])
-    observation_space = gym.spaces.Discrete(24)
+    observation_space = gym.spaces.Box(low=-np.inf, high=np.inf, shape=(24,), dtype=np.float32)
 
     spec = EnvSpec(
         id='seihrd-v0',
@@ -29,51 +34,102 @@ class SeihrdEnv(gym.Env):
         max_episode_steps=365,
     )
 
-    def __init__(self):
-        self.state = self.get_initial_state()
+    def __init__(
+            self,
+            location_file: str = DEFAULT_LOCATION_FILE,
+            start_offset: int = DEFAULT_START_OFFSET,
+            predraw_noise: bool = False,
+            copy_observations: bool = True,
+    ):
+        # With predraw_noise, the noise of the params of a whole episode is drawn at reset in a single call.
+        self.predraw_noise = predraw_noise
+        self.episode_noise = None
+
+        # The observations are written into a reusable buffer. `observation` is a read-only view of it, and
+        # without copy_observations, step and reset return that view instead of a copy.
+        self.copy_observations = copy_observations
+        self.observation_buffer = np.zeros(self.observation_space.shape, dtype=self.observation_space.dtype)
+        self.observation = self.observation_buffer.view()
+        self.observation.flags.writeable = False
 
         self.action_transitions = ActionTransitions()
-        self.seasonal_transitions = SeasonalTransitions()
+        self.seasonal_transitions = SeasonalTransitions(location_file, start_offset)
         self.population_transitions = PopulationTransitions()
 
-        self.state = self.seasonal_transitions(self.state)
+        # Every episode starts from a copy of this template.
+        self.start_offset = start_offset
+        self.initial_state = ArrayState.from_state(self.get_initial_state())
+        self.state = None
+        self.reset()
 
     def step(self, action: Sequence[int]):
         s = self.state
-        s_prev = self.state.copy(deep=True)
+        prev_infected = s.populations[c2i['infected']].sum()
 
-        s = self.seasonal_transitions(s)
-        s = self.action_transitions(s, action)
-        s = self.population_transitions(s)
+        self.seasonal_transitions(s)
+        self.action_transitions(s, action)
+        self.population_transitions(s, self.draw_noise())
 
         s.time_step += 1
         s.is_done = s.time_step >= s.hyper_parameters.max_steps
 
-        self.state = s
         return (
             self.observe(),
-            self.reward(s_prev),
+            self.reward(prev_infected),
             s.is_done,
             s.is_done,
-            {'action_mask': s.action_mask}
+            {'action_mask': s.action_mask.copy()}
         )
 
-    def reset(self, *_args, **_kwargs) -> (np.array, dict):
-        self.__init__()
-        return self.observe(), {'action_mask': self.state.action_mask}
+    def reset(self, *, seed=None, options=None) -> (np.array, dict):
+        """
+        Starts an episode from the initial state template, reusing the transitions. The options of the episode can be:
+            start_offset: day of the location data at time step 0 (defaults to the start offset of the env).
+            initial_populations: (6, 3) populations at time step 0, rows in `compartments` order and columns uv, fv, b.
+        """
+        super().reset(seed=seed)
+        options = options or {}
+
+        self.seasonal_transitions.select_schedule(options.get('start_offset', self.start_offset))
+        self.seasonal_transitions.check_schedule(self.initial_state.hyper_parameters.max_steps)
+
+        self.state = self.initial_state.copy()
+        if 'initial_populations' in options:
+            self.state.populations[:] = options['initial_populations']
+        self.seasonal_transitions(self.state)
+
+        if self.predraw_noise:
+            self.episode_noise = self.np_random.standard_normal((self.state.hyper_parameters.max_steps, n_params))
+        return self.observe(), {'action_mask': self.state.action_mask.copy()}
+
+    def draw_noise(self):
+        """
+        Standard normal noise of the params for the current time step, from the seeded generator of the env.
+        """
+        if self.episode_noise is not None and self.state.time_step < len(self.episode_noise):
+            return self.episode_noise[self.state.time_step]
+        return self.np_random.standard_normal(n_params)
 
     def observe(self):
-        populations = self.state.populations.to_list()
-        populations = np.array(populations).flatten() / self.state.populations.total()
+        s = self.state
+        obs = self.observation_buffer
+        n_populations = s.populations.size
+        n_actions = len(i2a)
+
+        np.divide(s.populations.reshape(-1), s.populations.sum(), out=obs[:n_populations])
 
-        in_affect = [self.state.action_in_effect[a] / self.state.hyper_parameters.action_durations[a] for a in range(len(i2a))]
-        progress = self.state.time_step / self.state.hyper_parameters.max_steps
+        durations, _ = self.action_transitions.limits(s.hyper_parameters)
+        in_affect = obs[n_populations:n_populations + n_actions]
+        in_affect[:] = 0
+        np.divide(s.action_in_effect, durations, out=in_affect, where=durations != 0)
 
-        obs = np.concatenate((populations, in_affect, [progress, self.state.epp]))
-        return obs
+        obs[-2] = s.time_step / s.hyper_parameters.max_steps
+        obs[-1] = s.epp
+
+        return obs.copy() if self.copy_observations else self.observation
 
     def render(self, mode='human'):
-        s = self.state.json(indent=4)
+        s = self.state.to_state().json(indent=4)
         if mode == 'human':
             print(s)
         elif mode == 'ansi':
@@ -83,20 +139,41 @@ class SeihrdEnv(gym.Env):
             self.render('human')
 
     def get_state_dict(self):
-        return self.state.dict()
-
-    def reward(self, state_prev):
-        prev_infected = state_prev.populations.infected.total()
+        return self.state.to_state().dict()
+
+    def get_snapshot(self):
+        """
+        Captures the state arrays of the simulation, the start offset of the seasonal schedule of the episode, the
+        state of the random number generator of the env and the pre-drawn noise of the episode, without the
+        transitions and the seasonal data they hold. The snapshot can be passed to restore_snapshot to branch rollouts
+        from this point.
+        """
+        return {
+            'state': self.state.copy(),
+            'start_offset': self.seasonal_transitions.start_offset,
+            'random_state': self.np_random.bit_generator.state,
+            'episode_noise': self.episode_noise,
+        }
+
+    def restore_snapshot(self, snapshot):
+        self.state = snapshot['state'].copy()
+        self.seasonal_transitions.select_schedule(snapshot['start_offset'])
+        self.np_random.bit_generator.state = snapshot['random_state']
+        self.episode_noise = snapshot['episode_noise']
+
+    def reward(self, prev_infected):
+        s = self.state
 
         # Reward calculation
         if prev_infected == 0:
             infection_change = 0
         else:
-            infection_change = (prev_infected - s.populations.infected.total()) / prev_infected
+            infection_change = (prev_infected - s.populations[c2i['infected']].sum()) / prev_infected
         reward = infection_change + s.epp
+        return reward
 
     def get_masks(self):
-        mask = np.ones((len(env.state.action_mask), 2))
+        mask = np.ones((len(self.state.action_mask), 2))
         mask[:, 1] = self.state.action_mask
         mask = mask.astype(np.int8)
         mask = tuple(mask)
@@ -0,0 +1,145 @@
+import numpy as np
+import gymnasium as gym
+from gymnasium.utils import seeding
+from gymnasium.vector import VectorEnv
+from seihrd.sim.array_state import ArrayState, c2i, n_params
+from seihrd.sim.base_models import i2a
+from seihrd.sim.seihrd_env import SeihrdEnv
+from seihrd.sim.transitions.action_transitions import ActionTransitions
+from seihrd.sim.transitions.population_transitions import PopulationTransitions
+from seihrd.sim.transitions.seasonal_transitions import (
+    SeasonalTransitions,
+    DEFAULT_LOCATION_FILE,
+    DEFAULT_START_OFFSET,
+)
+
+
+class SeihrdVecEnv(VectorEnv):
+    """
+    num_envs SEIHRD simulations stepped together.
+    The simulations are held in a single batched ArrayState (populations (N, 6, 3), params (N, n_params), in effect,
+    cool down and masks (N, 4), epp (N,)), so a step of all the simulations is one call of each transition.
+    Simulations are reset automatically when they are done, following the gymnasium VectorEnv conventions, and their
+    last observations are returned in infos['final_observation'].
+    """
+
+    def __init__(
+            self,
+            num_envs: int,
+            location_file: str = DEFAULT_LOCATION_FILE,
+            start_offset: int = DEFAULT_START_OFFSET,
+            copy_observations: bool = True,
+    ):
+        super().__init__(
+            num_envs=num_envs,
+            observation_space=SeihrdEnv.observation_space,
+            action_space=SeihrdEnv.action_space,
+        )
+
+        self.action_transitions = ActionTransitions()
+        self.seasonal_transitions = SeasonalTransitions(location_file, start_offset)
+        self.population_transitions = PopulationTransitions()
+
+        self.initial_state = ArrayState.from_state(SeihrdEnv.get_initial_state())
+        self.seasonal_transitions.check_schedule(self.initial_state.hyper_parameters.max_steps)
+        self.seasonal_transitions(self.initial_state)
+        self.state = self.initial_state.tile(num_envs)
+        self.actions = np.zeros((num_envs, len(i2a)), dtype=np.int64)
+
+        # The observations are written into a reusable (N, 24) buffer. `observations` is a read-only view of it, and
+        # without copy_observations, step and reset return that view instead of a copy.
+        self.copy_observations = copy_observations
+        self.observation_buffer = np.zeros(self.observation_space.shape, dtype=self.observation_space.dtype)
+        self.observations = self.observation_buffer.view()
+        self.observations.flags.writeable = False
+
+    def reset_envs(self, envs):
+        """
+        envs: boolean array (N,) selecting the simulations to reset.
+        """
+        self.state.assign(envs, self.initial_state)
+
+    def observe(self):
+        s = self.state
+        obs = self.observation_buffer
+        n_populations = s.populations[0].size
+        n_actions = len(i2a)
+
+        np.divide(
+            s.populations.reshape(self.num_envs, -1),
+            s.populations.sum(axis=(1, 2))[:, None],
+            out=obs[:, :n_populations]
+        )
+
+        durations, _ = self.action_transitions.limits(s.hyper_parameters)
+        in_affect = obs[:, n_populations:n_populations + n_actions]
+        in_affect[:] = 0
+        np.divide(s.action_in_effect, durations, out=in_affect, where=durations != 0)
+
+        np.divide(s.time_step, s.hyper_parameters.max_steps, out=obs[:, -2])
+        obs[:, -1] = s.epp
+
+        return obs.copy() if self.copy_observations else self.observations
+
+    def reward(self, prev_infected):
+        infected = self.state.populations[:, c2i['infected']].sum(axis=1)
+        infection_change = np.divide(
+            prev_infected - infected, prev_infected, out=np.zeros(self.num_envs), where=prev_infected != 0
+        )
+        return infection_change + self.state.epp
+
+    def action_masks(self):
+        """
+        Masks of the MultiDiscrete([2, 2, 2, 2]) actions in the flattened (N, 4 * 2) layout used by MaskablePPO: not
+        taking an action is always allowed, taking it is allowed by the action mask of the state.
+        """
+        masks = np.ones((self.num_envs, len(i2a), 2), dtype=bool)
+        masks[:, :, 1] = self.state.action_mask
+        return masks.reshape(self.num_envs, -1)
+
+    def reset_wait(self, seed=None, options=None):
+        if seed is not None:
+            if not isinstance(seed, int):
+                seed = seed[0]
+            self._np_random, seed = seeding.np_random(seed)
+
+        self.reset_envs(np.ones(self.num_envs, dtype=bool))
+
+        return self.observe(), {
+            'action_mask': self.state.action_mask.copy(),
+            '_action_mask': np.ones(self.num_envs, dtype=bool),
+        }
+
+    def step_async(self, actions):
+        self.actions = np.array(actions, dtype=np.int64)
+
+    def step_wait(self, **kwargs):
+        s = self.state
+        prev_infected = s.populations[:, c2i['infected']].sum(axis=1)
+
+        self.seasonal_transitions(s)
+        self.action_transitions(s, self.actions)
+        self.population_transitions(s, self.np_random.standard_normal((self.num_envs, n_params)))
+
+        s.time_step += 1
+        s.is_done = s.time_step >= s.hyper_parameters.max_steps
+
+        observations = self.observe()
+        rewards = self.reward(prev_infected)
+        dones = s.is_done.copy()
+
+        infos = {}
+        if dones.any():
+            final_observations = np.empty(self.num_envs, dtype=object)
+            for env in np.flatnonzero(dones):
+                final_observations[env] = observations[env].copy()
+            infos['final_observation'] = final_observations
+            infos['_final_observation'] = dones.copy()
+
+            self.reset_envs(dones)
+            observations = self.observe()
+
+        infos['action_mask'] = s.action_mask.copy()
+        infos['_action_mask'] = np.ones(self.num_envs, dtype=bool)
+
+        return observations, rewards, dones, dones.copy(), infos
@@ -0,0 +1,135 @@
+import asyncio
+import itertools
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional
+from seihrd.sim.seihrd_env import SeihrdEnv
+
+
+class SessionLimitError(Exception):
+    pass
+
+
+class SessionClosedError(Exception):
+    pass
+
+
+class Session:
+    """
+    A websocket client and its private env. The lock serializes the work on the env, since the executor may run the
+    tasks of a session on different threads.
+    """
+
+    def __init__(self, session_id: int, env: SeihrdEnv):
+        self.id = session_id
+        self.env = env
+        self.lock = asyncio.Lock()
+        self.closed = False
+        # The last work submitted to the executor.
+        self.work: Optional[Future] = None
+
+
+class EnvPool:
+    """
+    Up to `size` idle envs, created ahead of time so a new session doesn't wait for the construction of its env.
+    The envs are reset when a session starts, so they are returned to the pool as they are.
+    """
+
+    def __init__(self, size: int, env_factory: Callable[[], SeihrdEnv] = SeihrdEnv):
+        self.size = size
+        self.env_factory = env_factory
+        self.idle: List[SeihrdEnv] = []
+
+    def warm(self):
+        while len(self.idle) < self.size:
+            self.idle.append(self.env_factory())
+
+    def take(self) -> Optional[SeihrdEnv]:
+        return self.idle.pop() if self.idle else None
+
+    def give_back(self, env: SeihrdEnv):
+        if len(self.idle) < self.size:
+            self.idle.append(env)
+
+
+class SessionRegistry:
+    """
+    Keeps the open sessions and runs their simulation work on a bounded thread pool, so a slow step doesn't block
+    the event loop for the other clients. The envs of the sessions come from a pool of pre-initialized envs, and are
+    only created on demand when the pool is empty.
+    """
+
+    def __init__(
+            self,
+            max_sessions: int,
+            max_workers: int,
+            pool_size: int = 0,
+            env_factory: Callable[[], SeihrdEnv] = SeihrdEnv,
+    ):
+        self.max_sessions = max_sessions
+        self.pool = EnvPool(pool_size, env_factory)
+        self.max_workers = max_workers
+        self.executor = self.create_executor()
+        self.sessions: Dict[int, Session] = {}
+        self.reserved = 0
+        self.ids = itertools.count()
+
+    async def warm(self):
+        """
+        Fills the pool of envs, e.g. at the startup of the app.
+        """
+        await asyncio.get_running_loop().run_in_executor(self.executor, self.pool.warm)
+
+    async def open(self) -> Session:
+        """
+        Creates a session with an env of the pool. Raises SessionLimitError when max_sessions sessions are already open.
+        """
+        # The slot is reserved before the env is created, so concurrent opens can't exceed the limit.
+        if len(self.sessions) + self.reserved >= self.max_sessions:
+            raise SessionLimitError(f'The server already runs {self.max_sessions} sessions. Please try again later.')
+        env = self.pool.take()
+        if env is None:
+            self.reserved += 1
+            try:
+                env = await asyncio.get_running_loop().run_in_executor(self.executor, self.pool.env_factory)
+            finally:
+                self.reserved -= 1
+
+        session = Session(next(self.ids), env)
+        self.sessions[session.id] = session
+        return session
+
+    def close(self, session: Session):
+        """
+        Closes a session. Its env goes back to the pool once the work that is still running on it is done.
+        """
+        if self.sessions.pop(session.id, None) is None:
+            return
+        session.closed = True
+        if session.work is None or session.work.done():
+            self.pool.give_back(session.env)
+        else:
+            loop = asyncio.get_running_loop()
+            session.work.add_done_callback(lambda _: loop.call_soon_threadsafe(self.pool.give_back, session.env))
+
+    async def run(self, session: Session, fn: Callable, *args):
+        """
+        Runs fn(session.env, *args) on the executor after the previous work of the session is done.
+        Raises SessionClosedError when the session is closed.
+        """
+        async with session.lock:
+            if session.closed:
+                raise SessionClosedError(f'Session {session.id} is closed.')
+            session.work = self.executor.submit(fn, session.env, *args)
+            return await asyncio.wrap_future(session.work)
+
+    def create_executor(self):
+        return ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='seihrd-session')
+
+    def shutdown(self):
+        """
+        Stops the work of the sessions. The registry can be used again by the next startup of the app, with a new
+        executor (it only starts its threads on demand).
+        """
+        self.executor.shutdown(wait=False, cancel_futures=True)
+        self.executor = self.create_executor()
+        self.sessions.clear()
@@ -0,0 +1,121 @@
+import asyncio
+from typing import TYPE_CHECKING, Optional, Sequence
+import numpy as np
+from seihrd.sim.base_models import i2a
+from seihrd.sim.seihrd_env import SeihrdEnv
+
+if TYPE_CHECKING:
+    from seihrd.sim.rooms import Room
+
+
+def noop_policy(env: SeihrdEnv):
+    return [0] * len(i2a)
+
+
+def random_policy(env: SeihrdEnv):
+    return env.np_random.integers(0, 2, len(i2a)) * env.state.action_mask
+
+
+def parse_actions(actions, ndim: int) -> np.ndarray:
+    """
+    Returns the actions of a client as an int64 array of ndim dimensions whose last one is the 0 or 1 of each action.
+    Raises a ValueError for anything else.
+    """
+    actions = np.array(actions)
+    if actions.ndim != ndim or actions.shape[-1] != len(i2a) or not np.isin(actions, (0, 1)).all():
+        raise ValueError(f'The actions must be lists of {len(i2a)} values that are 0 or 1.')
+    return actions.astype(np.int64)
+
+
+# Policies that a client can run by name.
+policies = {
+    'noop': noop_policy,
+    'random': random_policy,
+}
+
+
+class Credits:
+    """
+    Number of frames that the client is ready to receive. The stream waits for a credit before every frame, so the
+    server never queues more frames than the client granted.
+    """
+
+    def __init__(self, credits: int):
+        self.credits = credits
+        self.available = asyncio.Event()
+        if credits > 0:
+            self.available.set()
+
+    def grant(self, credits: int):
+        self.credits += credits
+        if self.credits > 0:
+            self.available.set()
+
+    async def take(self):
+        await self.available.wait()
+        self.credits -= 1
+        if self.credits <= 0:
+            self.available.clear()
+
+
+class StepStream:
+    """
+    Runs up to `steps` steps of a room and sends a frame to its members after every step, at most `rate` frames per
+    second and only while the client that started the run has credits. The actions are taken from the `actions`
+    schedule (repeated when it is shorter than the run) or chosen by the named policy.
+    """
+
+    def __init__(
+            self,
+            room: 'Room',
+            steps: int,
+            actions: Optional[Sequence[Sequence[int]]] = None,
+            policy: Optional[str] = None,
+            rate: Optional[float] = None,
+            credits: int = 1,
+    ):
+        if actions:
+            actions = parse_actions(actions, ndim=2)
+            self.choose_action = lambda env, i: actions[i % len(actions)]
+        elif policy in policies:
+            self.choose_action = lambda env, i: policies[policy](env)
+        else:
+            raise ValueError(f'A run needs an action schedule or one of the policies {list(policies)}.')
+
+        self.room = room
+        self.steps = int(steps)
+        self.interval = 1 / float(rate) if rate else 0
+        self.credits = Credits(int(credits))
+        self.stopped = False
+
+    def stop(self):
+        self.stopped = True
+        # Wakes up the stream if it waits for a credit.
+        self.credits.grant(1)
+
+    def step(self, env: SeihrdEnv, i: int):
+        return self.room.advance(env, self.choose_action(env, i))
+
+    async def run(self):
+        """
+        Streams the steps, and always ends with a 'run_end' message, whose error tells why the run failed.
+        """
+        loop = asyncio.get_running_loop()
+        next_frame_time = loop.time()
+        steps = 0
+        error = None
+        try:
+            while steps < self.steps and not self.room.session.env.state.is_done:
+                await self.credits.take()
+                if self.stopped:
+                    break
+                if self.interval:
+                    await asyncio.sleep(max(0.0, next_frame_time - loop.time()))
+                    next_frame_time = max(next_frame_time, loop.time()) + self.interval
+
+                await self.room.publish(self.step, steps)
+                steps += 1
+        except Exception as e:
+            error = f'The run failed: {e}'
+        finally:
+            await self.room.broadcast({'type': 'run_end', 'steps': steps, 'error': error})
@@ -0,0 +1,86 @@
+import unittest
+import numpy as np
+from seihrd.sim.frames import FrameEncoder, STATE_FRAME, header, int_fields, float_fields
+from seihrd.sim.seihrd_env import SeihrdEnv
+
+n_values = len(int_fields) + len(float_fields)
+
+
+def decode(frame: bytes, ints: np.ndarray, floats: np.ndarray):
+    """
+    Applies a frame to the values of the previous frames, and returns its header fields and the indices it changed.
+    """
+    frame_type, is_done, count, time_step, mask_lo, mask_hi = header.unpack_from(frame)
+    mask = mask_lo | mask_hi << 32
+    changed = [i for i in range(count) if mask >> i & 1]
+    changed_ints = [i for i in changed if i < len(int_fields)]
+    changed_floats = [i - len(int_fields) for i in changed if i >= len(int_fields)]
+    offset = header.size
+    ints[changed_ints] = np.frombuffer(frame, '<i4', count=len(changed_ints), offset=offset)
+    offset += 4 * len(changed_ints)
+    floats[changed_floats] = np.frombuffer(frame, '<f4', count=len(changed_floats), offset=offset)
+    assert offset + 4 * len(changed_floats) == len(frame)
+    return frame_type, bool(is_done), count, time_step, changed
+
+
+class FrameEncoderTestCase(unittest.TestCase):
+    def setUp(self):
+        self.env = SeihrdEnv()
+        self.env.reset(seed=2)
+        self.encoder = FrameEncoder()
+        self.ints = np.zeros(len(int_fields), dtype=np.int64)
+        self.floats = np.zeros(len(float_fields), dtype=np.float32)
+
+    def decode(self, frame: bytes):
+        return decode(frame, self.ints, self.floats)
+
+    def assert_decoded(self, time_step: int, is_done: bool):
+        s = self.env.state
+        state = s.to_state()
+        self.assertEqual(time_step, state.time_step)
+        self.assertEqual(is_done, state.is_done)
+        n_populations = s.populations.size
+        np.testing.assert_array_equal(self.ints[:n_populations].reshape(s.populations.shape), s.populations)
+        actions = self.ints[n_populations:].reshape(3, -1)
+        self.assertEqual(actions[0].tolist(), state.action_in_effect)
+        self.assertEqual(actions[1].tolist(), state.action_cool_down)
+        self.assertEqual(actions[2].tolist(), state.action_mask)
+        np.testing.assert_allclose(self.floats[:-1], s.params, rtol=1e-6)
+        self.assertAlmostEqual(float(self.floats[-1]), state.epp, places=4)
+
+    def test_first_frame_is_full(self):
+        frame_type, is_done, count, time_step, changed = self.decode(self.encoder.encode(self.env.state))
+        self.assertEqual(frame_type, STATE_FRAME)
+        self.assertEqual(count, n_values)
+        self.assertEqual(changed, list(range(n_values)))
+        self.assert_decoded(time_step, is_done)
+
+    def test_frames_hold_the_changes(self):
+        self.decode(self.encoder.encode(self.env.state))
+        for action in ([0, 0, 1, 0], [0, 0, 0, 0], [1, 0, 0, 1]):
+            previous = np.concatenate((self.ints, self.floats.view(np.int32)))
+            self.env.step(action)
+            _, is_done, _, time_step, changed = self.decode(self.encoder.encode(self.env.state))
+            self.assert_decoded(time_step, is_done)
+
+            current = np.concatenate((self.ints, self.floats.view(np.int32)))
+            self.assertEqual(changed, np.flatnonzero(current != previous).tolist())
+            self.assertLess(len(changed), n_values)
+
+        # A state that did not change gives an empty frame.
+        frame = self.encoder.encode(self.env.state)
+        self.assertEqual(self.decode(frame)[-1], [])
+        self.assertEqual(len(frame), header.size)
+
+    def test_nan_is_not_sent_again(self):
+        self.env.state.params[0] = np.nan
+        self.decode(self.encoder.encode(self.env.state))
+        self.assertTrue(np.isnan(self.floats[0]))
+
+        self.env.state.epp -= 1
+        _, _, _, _, changed = self.decode(self.encoder.encode(self.env.state))
+        self.assertEqual(changed, [n_values - 1])
+
+
+if __name__ == '__main__':
+    unittest.main()
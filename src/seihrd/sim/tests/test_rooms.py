@@ -0,0 +1,73 @@
+import unittest
+from unittest import mock
+import numpy as np
+from starlette.testclient import TestClient
+from seihrd.sim import api, rooms
+from seihrd.sim.frames import header, int_fields
+
+
+class RoomTestCase(unittest.TestCase):
+    def test_late_member_watches_the_driver(self):
+        with TestClient(api.app) as client, client.websocket_connect('/ws?room=r') as driver:
+            driver.receive_json()
+            self.assertTrue(driver.receive_json()['driver'])
+            for _ in range(3):
+                driver.send_json({'type': 'step', 'action': [0, 0, 1, 0]})
+                state = driver.receive_json()['state']
+
+            with client.websocket_connect('/ws?room=r&protocol=binary') as spectator:
+                self.assertEqual(len(api.registry.sessions), 1)
+
+                # The snapshot of the late member is a full frame of the current state.
+                self.assertEqual(spectator.receive_json()['type'], 'session')
+                frame = spectator.receive_bytes()
+                _, is_done, n_values, time_step, mask_lo, mask_hi = header.unpack_from(frame)
+                self.assertEqual((time_step, is_done), (state['time_step'], state['is_done']))
+                self.assertEqual(mask_lo | mask_hi << 32, (1 << n_values) - 1)
+                ints = np.frombuffer(frame, '<i4', count=len(int_fields), offset=header.size)
+                populations = [state['populations'][c][sc] for c, sc in (f.split('.')[1:] for f in int_fields[:18])]
+                self.assertEqual(ints[:18].tolist(), populations)
+                self.assertEqual(ints[18:22].tolist(), state['action_in_effect'])
+                self.assertFalse(spectator.receive_json()['driver'])
+
+                spectator.send_json({'type': 'step', 'action': [0, 0, 0, 0]})
+                self.assertIn('Only the driver', spectator.receive_json()['error'])
+
+                driver.send_json({'type': 'step', 'action': [0, 0, 1, 0]})
+                state = driver.receive_json()['state']
+                self.assertEqual(header.unpack_from(spectator.receive_bytes())[3], state['time_step'])
+
+    def test_next_member_drives_when_the_driver_leaves(self):
+        with TestClient(api.app) as client, client.websocket_connect('/ws?room=r') as driver:
+            driver.receive_json()
+            with client.websocket_connect('/ws?room=r') as member:
+                member.receive_json()
+                self.assertFalse(member.receive_json()['driver'])
+                driver.close()
+                self.assertTrue(member.receive_json()['driver'])
+
+                member.send_json({'type': 'step', 'action': [0, 0, 0, 0]})
+                self.assertEqual(member.receive_json()['state']['time_step'], 1)
+
+
+    def test_failing_steps_are_answered(self):
+        def failing_step(env, action):
+            raise IndexError('no data')
+
+        with TestClient(api.app) as client, client.websocket_connect('/ws') as ws:
+            max_steps = ws.receive_json()['state']['hyper_parameters']['max_steps']
+            ws.receive_json()
+            with mock.patch.object(rooms.Room, 'advance', staticmethod(failing_step)):
+                ws.send_json({'type': 'step', 'action': [0, 0, 0, 0]})
+                self.assertEqual(ws.receive_json()['error'], 'The step failed: no data')
+
+            # The episode still runs to its end.
+            for _ in range(max_steps):
+                ws.send_json({'type': 'step', 'action': [0, 0, 0, 0]})
+                state = ws.receive_json()['state']
+            self.assertTrue(state['is_done'])
+            ws.send_json({'type': 'step', 'action': [0, 0, 0, 0]})
+            self.assertEqual(ws.receive_json()['error'], 'The episode is done.')
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,40 @@
+import unittest
+import numpy as np
+from seihrd.sim.seihrd_env import SeihrdEnv
+from seihrd.sim.seihrd_vec_env import SeihrdVecEnv
+
+
+class SeihrdVecEnvTestCase(unittest.TestCase):
+    def test_matches_single_env(self):
+        env = SeihrdEnv()
+        vec_env = SeihrdVecEnv(1)
+        obs, _ = env.reset(seed=4)
+        vec_obs, _ = vec_env.reset(seed=4)
+        np.testing.assert_array_equal(vec_obs[0], obs)
+
+        for action in ([0, 0, 0, 0], [0, 1, 0, 0], [0, 0, 1, 0], [1, 0, 0, 1], [0, 0, 0, 0]):
+            obs, reward, _, _, info = env.step(action)
+            vec_obs, vec_reward, _, _, vec_info = vec_env.step([action])
+            np.testing.assert_array_equal(vec_obs[0], obs)
+            self.assertEqual(vec_reward[0], reward)
+            self.assertEqual(list(vec_info['action_mask'][0]), list(info['action_mask']))
+
+    def test_autoreset(self):
+        vec_env = SeihrdVecEnv(3)
+        vec_env.reset(seed=0)
+        max_steps = vec_env.state.hyper_parameters.max_steps
+
+        for _ in range(max_steps - 1):
+            _, _, done, _, info = vec_env.step(np.zeros((3, 4), dtype=int))
+            self.assertFalse(done.any())
+        self.assertEqual(list(vec_env.state.time_step), [max_steps - 1] * 3)
+
+        _, _, done, _, info = vec_env.step(np.zeros((3, 4), dtype=int))
+        self.assertTrue(done.all())
+        self.assertEqual(info['final_observation'][0][-2], 1)
+        self.assertEqual(list(vec_env.state.time_step), [0] * 3)
+        self.assertEqual(vec_env.action_masks().shape, (3, 8))
+
+
+if __name__ == '__main__':
+    unittest.main()
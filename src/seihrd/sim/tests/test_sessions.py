@@ -0,0 +1,25 @@
+import unittest
+from unittest import mock
+from starlette.testclient import TestClient
+from seihrd.sim import api
+
+
+class SessionRegistryTestCase(unittest.TestCase):
+    def test_session_limit(self):
+        with mock.patch.object(api.registry, 'max_sessions', 1), TestClient(api.app) as client:
+            with client.websocket_connect('/ws') as ws:
+                ws.receive_json()
+                with client.websocket_connect('/ws') as rejected:
+                    self.assertIn('already runs 1 sessions', rejected.receive_json()['error'])
+                    self.assertEqual(rejected.receive()['code'], 1013)
+                self.assertEqual(len(api.registry.sessions), 1)
+
+            # The session is closed with its connection, and its env goes back to the pool.
+            self.assertEqual(len(api.registry.sessions), 0)
+            self.assertEqual(len(api.registry.pool.idle), api.registry.pool.size)
+            with client.websocket_connect('/ws') as ws:
+                self.assertEqual(ws.receive_json()['state']['time_step'], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
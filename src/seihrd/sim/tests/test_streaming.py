@@ -0,0 +1,59 @@
+import unittest
+from unittest import mock
+from starlette.testclient import TestClient
+from seihrd.sim import api, streaming
+
+
+def failing_policy(env):
+    raise RuntimeError('no action')
+
+
+class StepStreamTestCase(unittest.TestCase):
+    def test_frames_are_capped_by_the_credits(self):
+        with TestClient(api.app) as client, client.websocket_connect('/ws') as ws:
+            ws.receive_json()
+            self.assertTrue(ws.receive_json()['driver'])
+            ws.send_json({'type': 'run', 'steps': 50, 'policy': 'noop', 'credits': 3})
+            time_steps = [ws.receive_json()['state']['time_step'] for _ in range(3)]
+            self.assertEqual(time_steps, [1, 2, 3])
+
+            # Without credits the stream waits, so the answer to the step is the next message.
+            ws.send_json({'type': 'step', 'action': [0, 0, 0, 0]})
+            self.assertEqual(ws.receive_json()['error'], 'A run is in progress.')
+
+            ws.send_json({'type': 'credit', 'credits': 1})
+            self.assertEqual(ws.receive_json()['state']['time_step'], 4)
+            ws.send_json({'type': 'stop'})
+            self.assertEqual(ws.receive_json(), {'type': 'run_end', 'steps': 4, 'error': None})
+
+    def test_invalid_runs(self):
+        with TestClient(api.app) as client, client.websocket_connect('/ws') as ws:
+            ws.receive_json()
+            self.assertTrue(ws.receive_json()['driver'])
+            for run in (
+                    {'type': 'run', 'steps': 5, 'actions': [[1, 0, 0]], 'credits': 5},
+                    {'type': 'run', 'steps': 5, 'actions': [[1, 0, 0, 2]]},
+                    {'type': 'run', 'steps': None, 'policy': 'noop'},
+                    {'type': 'run', 'steps': 5, 'policy': 'noop', 'rate': 'x'},
+                    {'type': 'run', 'steps': 5},
+            ):
+                ws.send_json(run)
+                self.assertTrue(ws.receive_json()['error'].startswith('Invalid run'))
+
+            # The session still works.
+            ws.send_json({'type': 'step', 'action': [0, 0, 0, 0]})
+            self.assertEqual(ws.receive_json()['state']['time_step'], 1)
+
+    def test_failed_run_ends(self):
+        with mock.patch.dict(streaming.policies, {'failing': failing_policy}):
+            with TestClient(api.app) as client, client.websocket_connect('/ws') as ws:
+                ws.receive_json()
+                self.assertTrue(ws.receive_json()['driver'])
+                ws.send_json({'type': 'run', 'steps': 5, 'policy': 'failing', 'credits': 5})
+                self.assertEqual(
+                    ws.receive_json(), {'type': 'run_end', 'steps': 0, 'error': 'The run failed: no action'},
+                )
+
+
+if __name__ == '__main__':
+    unittest.main()
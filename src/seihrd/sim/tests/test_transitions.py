@@ -1,5 +1,7 @@
 import unittest
+import numpy as np
 from seihrd.sim.seihrd_env import SeihrdEnv
+from seihrd.sim.transitions.seasonal_transitions import DEFAULT_START_OFFSET
 
 
 class ActionMaskTestCase(unittest.TestCase):
@@ -95,5 +97,32 @@ class ActionMaskTestCase(unittest.TestCase):
         self.assertEqual(list(env.state.action_cool_down), [0, 0, 0, 0])
 
 
+class SeasonalTransitionsTestCase(unittest.TestCase):
+    def test_start_offset_without_enough_data(self):
+        env = SeihrdEnv()
+        # Leaves 30 days of seasonal data for the episode.
+        start_offset = DEFAULT_START_OFFSET + len(env.seasonal_transitions.schedule) - 30
+        with self.assertRaisesRegex(ValueError, f'start offset {start_offset}'):
+            env.reset(options={'start_offset': start_offset})
+
+        env.reset(options={'start_offset': start_offset - env.state.hyper_parameters.max_steps + 30})
+        for _ in range(env.state.hyper_parameters.max_steps):
+            env.step([0, 0, 0, 0])
+        self.assertTrue(env.state.is_done)
+
+
+    def test_snapshot_keeps_the_start_offset(self):
+        env = SeihrdEnv()
+        env.reset(seed=1, options={'start_offset': DEFAULT_START_OFFSET + 36})
+        for _ in range(3):
+            env.step([0, 0, 0, 0])
+        snapshot = env.get_snapshot()
+        expected = [env.step([0, 0, 1, 0])[0] for _ in range(30)]
+
+        # The next reset selects the default schedule again.
+        env.reset()
+        env.restore_snapshot(snapshot)
+        np.testing.assert_array_equal([env.step([0, 0, 1, 0])[0] for _ in range(30)], expected)
+
 if __name__ == '__main__':
     unittest.main()
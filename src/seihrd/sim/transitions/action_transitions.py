@@ -1,12 +1,14 @@
 from typing import Sequence
 import numpy as np
-from seihrd.sim.base_models import State, A, a2i
+from seihrd.sim.base_models import A, a2i
+from seihrd.sim.array_state import ArrayState, c2i, p2i
 
 
 class ActionTransitions:
     """
     This will take the current state and the action and
-    returns the updated state based on the action.
+    updates the state in place based on the action.
+    The state can hold a batch of simulations, in which case the action has a leading batch dimension too.
     Specifically, it updates the following properties:
         1. params.beta
         2. epp
@@ -35,33 +37,55 @@ class ActionTransitions:
             (0, 0, 1, 1): (0.90, 0.9935),
             (1, 0, 1, 1): (0.60, 0.9925),
         }
+        # Multipliers when no action is taken, indexed by whether the infected fraction is below 0.001.
+        self.no_action_multiplier = np.array([
+            # beta epp
+            (1.4, 0.999),
+            (1.1, 1.005),
+        ])
+        # Actions that set vfv.
+        # AD: Nitin, can you please explain?
+        self.vfv_actions = [  # M, SM, SV, LM
+            # S L  M  V
+            (0, 0, 1, 0),
+            (1, 0, 1, 0),
+            (1, 0, 0, 1),
+            (0, 1, 1, 0),
+        ]
+
+        # The tables are indexed by the 4-bit code of an action (S is the highest bit). Code 0 is no action.
+        self.code_bits = 1 << np.arange(len(a2i))[::-1]
+        codes = np.array(list(self.multiplier)) @ self.code_bits
+        self.beta_multiplier = np.ones(1 << len(a2i))
+        self.epp_multiplier = np.ones(1 << len(a2i))
+        self.beta_multiplier[codes], self.epp_multiplier[codes] = zip(*self.multiplier.values())
+        self.sets_vfv = np.zeros(1 << len(a2i), dtype=bool)
+        self.sets_vfv[np.array(self.vfv_actions) @ self.code_bits] = True
 
-    def __call__(self, state: State, action: Sequence[int]):
-        s = state.copy(deep=True)
-        in_effect = np.array(s.action_in_effect, dtype=float)
-        cooldown = np.array(s.action_cool_down, dtype=float)
-        max_in_effect = np.array(s.hyper_parameters.action_durations)
-        max_cooldown = np.array(s.hyper_parameters.action_cool_downs)
+        self._limits_source = None
+        self._limits = None
+
+    def __call__(self, state: ArrayState, action: Sequence[int]):
+        s = state
+        in_effect = s.action_in_effect
+        cooldown = s.action_cool_down
+        max_in_effect, max_cooldown = self.limits(s.hyper_parameters)
 
         # Only look at valid actions.
-        action = np.array(s.action_mask) * np.array(action)
+        action = s.action_mask * np.asarray(action)
         # Apply actions that are already in effect.
         action = (action | (in_effect > 0)) * 1
+        code = action @ self.code_bits
 
         """ BETA & EPP """
-        if action.sum() == 0:
-            if s.populations.infected.total() / s.populations.total() < 0.001:
-                beta_m = 1.1
-                epp_m = 1.005
-            else:
-                beta_m = 1.4
-                epp_m = 0.999
-        else:
-            beta_m, epp_m = self.multiplier[tuple(action)]
-
-        s.params.beta *= beta_m
-        s.epp *= epp_m
-        s.epp = min(s.epp, 100)
+        infected = s.populations[..., c2i['infected'], :].sum(axis=-1)
+        low_infection = infected / s.populations.sum(axis=(-2, -1)) < 0.001
+        no_action_m = self.no_action_multiplier[low_infection * 1]
+        beta_m = np.where(code == 0, no_action_m[..., 0], self.beta_multiplier[code])
+        epp_m = np.where(code == 0, no_action_m[..., 1], self.epp_multiplier[code])
+
+        s.params[..., p2i['beta']] *= beta_m
+        s.epp = np.minimum(s.epp * epp_m, 100)
 
         """ IN EFFECT """
         # Increment in_effect
@@ -69,8 +93,6 @@ class ActionTransitions:
         # If max duration reached, set in_effect = 0
         finished = max_in_effect == in_effect
         in_effect *= ~finished
-
-        s.action_in_effect = in_effect
         # AD: Should we reverse the effect after the in_effect is done?
 
         """ COOLDOWN """
@@ -81,26 +103,26 @@ class ActionTransitions:
         # If max duration reached, set cooldown = 0
         cooldown *= max_cooldown != cooldown
 
-        s.action_cool_down = cooldown
-
         """ ACTION MASK """
         # An action is legal only if in_effect = 0 and cooldown = 0
         mask = (cooldown + in_effect) == 0
         # Additionally, if L is in_effect, S is illegal.
-        if in_effect[a2i[A.lockdown]] > 0:
-            mask[a2i[A.social_distancing]] = False
+        mask[..., a2i[A.social_distancing]] &= in_effect[..., a2i[A.lockdown]] == 0
 
-        s.action_mask = mask * 1
+        s.action_mask[:] = mask
 
         """ VFV """
-        # AD: Nitin, can you please explain?
-        if tuple(action) in (  # M, SM, SV, LM
-            # S L  M  V
-            (0, 0, 1, 0),
-            (1, 0, 1, 0),
-            (1, 0, 0, 1),
-            (0, 1, 1, 0),
-        ):
-            s.params.vfv = 0.007084760245099044
+        s.params[..., p2i['vfv']] = np.where(self.sets_vfv[code], 0.007084760245099044, s.params[..., p2i['vfv']])
 
         return s
+
+    def limits(self, hyper_parameters):
+        """
+        Action durations and cool downs as arrays. They are only rebuilt when the lists of the hyper parameters are
+        replaced.
+        """
+        source = (hyper_parameters.action_durations, hyper_parameters.action_cool_downs)
+        if self._limits_source is None or any(a is not b for a, b in zip(source, self._limits_source)):
+            self._limits_source = source
+            self._limits = tuple(np.array(limit) for limit in source)
+        return self._limits
@@ -1,145 +1,113 @@
-from seihrd.sim.base_models import SubCompPopulations, State
+import numpy as np
+from seihrd.sim.array_state import ArrayState, c2i, p2i
 
 
 class PopulationTransitions:
-    def __call__(self, state: State):
-        s = state.copy(deep=True)
-        po = s.populations.copy(deep=True)
-        pa = s.params.copy(deep=True)
-        pa.noisy()
+    """
+    This will take the current state and update its populations in place.
+    The update itself is done by `advance`, which works on a leading batch dimension so one call can advance many
+    simulations. The terms are added in the same order as the per-sub-compartment equations, and the vaccination
+    transfers are added as (+ inflow - outflow) with exact zeros, so the populations are truncated to the same integers.
+    """
 
-        i = (po.infected.total() ** pa.alpha) / po.total()
+    def __call__(self, state: ArrayState, noise: np.ndarray):
+        """
+        noise: standard normal draws of the shape of the params. Each param gets a noise of 5% of its value.
+        """
+        s = state
+        pa = self.noisy(s.params, noise)
 
-        s.populations.susceptible = SubCompPopulations(
-            uv=int(
-                po.susceptible.uv
-                - (pa.beta * po.susceptible.uv * i)
-                + (pa.e_s.uv * po.exposed.uv)
-                - (pa.vfv * po.susceptible.uv)
-            ),
-            fv=int(
-                po.susceptible.fv
-                - (pa.beta * po.susceptible.fv * i)
-                + (pa.e_s.fv * po.exposed.fv)
-                + (pa.vfv * po.susceptible.uv)
-                - (pa.vb * po.susceptible.fv)
-            ),
-            b=int(
-                po.susceptible.b
-                - (pa.beta * po.susceptible.b * i)
-                + (pa.e_s.b * po.exposed.b)
-                + (pa.vb * po.susceptible.fv)
-            )
-        )
+        s.populations[:] = self.advance(s.populations, pa)
 
-        s.populations.exposed = SubCompPopulations(
-            uv=int(
-                po.exposed.uv
-                + (pa.beta * po.susceptible.uv * i)
-                + (pa.beta * po.recovered.uv * i)
-                - (pa.e_i.uv * po.exposed.uv)
-                - (pa.e2_i.uv * po.exposed.uv)
-                - (pa.e_s.uv * po.exposed.uv)
-                - (pa.e_r.uv * po.exposed.uv)
-                - (pa.vfv * po.exposed.uv)
-            ),
-            fv=int(
-                po.exposed.fv
-                + (pa.beta * po.susceptible.fv * i)
-                + (pa.beta * po.recovered.fv * i)
-                - (pa.e_i.fv * po.exposed.fv)
-                - (pa.e2_i.fv * po.exposed.fv)
-                - (pa.e_s.fv * po.exposed.fv)
-                - (pa.e_r.fv * po.exposed.fv)
-                + (pa.vfv * po.exposed.uv)
-                - (pa.vb * po.exposed.fv)
-            ),
-            b=int(
-                po.exposed.b
-                + (pa.beta * po.susceptible.b * i)
-                + (pa.beta * po.recovered.b * i)
-                - (pa.e_i.b * po.exposed.b)
-                - (pa.e2_i.b * po.exposed.b)
-                - (pa.e_s.b * po.exposed.b)
-                - (pa.e_r.b * po.exposed.b)
-                + (pa.vb * po.exposed.fv)
-            )
-        )
+        return s
 
-        s.populations.infected = SubCompPopulations(
-            uv=self._updated_infected('uv', po, pa),
-            fv=self._updated_infected('fv', po, pa),
-            b=self._updated_infected('b', po, pa),
-        )
+    @staticmethod
+    def noisy(params: np.ndarray, noise: np.ndarray) -> np.ndarray:
+        return params + params * 0.05 * noise
 
-        s.populations.hospitalized = SubCompPopulations(
-            uv=self._updated_hospitalized('uv', po, pa),
-            fv=self._updated_hospitalized('fv', po, pa),
-            b=self._updated_hospitalized('b', po, pa),
+    @classmethod
+    def advance(cls, populations: np.ndarray, params: np.ndarray) -> np.ndarray:
+        """
+        populations: (..., 6, 3) int array, rows in `compartments` order and columns uv, fv, b.
+        params: (..., n_params) float array laid out as described by `p2i`.
+        Returns the truncated populations of the next time step, as a new (..., 6, 3) int array.
+        """
+        po = populations
+        pa = params
+        susceptible, exposed, infected, hospitalized, recovered, deceased = (
+            po[..., c2i[c], :] for c in ('susceptible', 'exposed', 'infected', 'hospitalized', 'recovered', 'deceased')
         )
+        beta = pa[..., p2i['beta'], None]
+        e_s, e_i, i_r, i_h, i_d = (pa[..., p2i[p]] for p in ('e_s', 'e_i', 'i_r', 'i_h', 'i_d'))
+        e2_i, h_r, h_d, e_r = (pa[..., p2i[p]] for p in ('e2_i', 'h_r', 'h_d', 'e_r'))
 
-        s.populations.recovered = SubCompPopulations(
-            uv=int(
-                po.recovered.uv
-                - (pa.beta * po.recovered.uv * i)
-                + (pa.e_r.uv * po.exposed.uv)
-                + (pa.i_r.uv * po.infected.uv)
-                + (pa.h_r.uv * po.hospitalized.uv)
-                - (pa.vfv * po.recovered.uv)
-            ),
-            fv=int(
-                po.recovered.fv
-                - (pa.beta * po.recovered.fv * i)
-                + (pa.e_r.fv * po.exposed.fv)
-                + (pa.i_r.fv * po.infected.fv)
-                + (pa.h_r.fv * po.hospitalized.fv)
-                + (pa.vfv * po.recovered.uv)
-                - (pa.vb * po.recovered.fv)
-            ),
-            b=int(
-                po.recovered.b
-                - (pa.beta * po.recovered.b * i)
-                + (pa.e_r.b * po.exposed.b)
-                + (pa.i_r.b * po.infected.b)
-                + (pa.h_r.b * po.hospitalized.b)
-                + (pa.vb * po.recovered.fv)
-            )
-        )
+        i = (infected.sum(axis=-1) ** pa[..., p2i['alpha']]) / po.sum(axis=(-2, -1))
+        i = i[..., None]
+        transfers = cls.vaccination_transfers(pa)
 
-        s.populations.deceased = SubCompPopulations(
-            uv=self._updated_deceased('uv', po, pa),
-            fv=self._updated_deceased('fv', po, pa),
-            b=self._updated_deceased('b', po, pa),
+        updated = np.empty(po.shape)
+        updated[..., c2i['susceptible'], :] = cls._vaccinated(
+            susceptible
+            - (beta * susceptible * i)
+            + (e_s * exposed),
+            susceptible, transfers
         )
-
-        return s
-
-    @staticmethod
-    def _updated_infected(comp, po, pa):
-        return int(
-            po.infected[comp]
-            + (pa.e_i[comp] * po.exposed[comp])
-            + (pa.e2_i[comp] * po.exposed[comp])
-            - (pa.i_h[comp] * po.infected[comp])
-            - (pa.i_r[comp] * po.infected[comp])
-            - (pa.i_d[comp] * po.infected[comp])
+        updated[..., c2i['exposed'], :] = cls._vaccinated(
+            exposed
+            + (beta * susceptible * i)
+            + (beta * recovered * i)
+            - (e_i * exposed)
+            - (e2_i * exposed)
+            - (e_s * exposed)
+            - (e_r * exposed),
+            exposed, transfers
+        )
+        updated[..., c2i['infected'], :] = (
+            infected
+            + (e_i * exposed)
+            + (e2_i * exposed)
+            - (i_h * infected)
+            - (i_r * infected)
+            - (i_d * infected)
             # AD: Why no vaccination conversions?
         )
-
-    @staticmethod
-    def _updated_hospitalized(comp, po, pa):
-        return int(
-            po.hospitalized[comp]
-            + (pa.i_h[comp] * po.infected[comp])
-            - (pa.h_r[comp] * po.hospitalized[comp])
-            - (pa.h_d[comp] * po.hospitalized[comp])
+        updated[..., c2i['hospitalized'], :] = (
+            hospitalized
+            + (i_h * infected)
+            - (h_r * hospitalized)
+            - (h_d * hospitalized)
             # AD: Why no vaccination conversions?
         )
+        updated[..., c2i['recovered'], :] = cls._vaccinated(
+            recovered
+            - (beta * recovered * i)
+            + (e_r * exposed)
+            + (i_r * infected)
+            + (h_r * hospitalized),
+            recovered, transfers
+        )
+        updated[..., c2i['deceased'], :] = (
+            deceased
+            + (i_d * infected)
+            + (h_d * hospitalized)
+        )
+
+        return np.trunc(updated).astype(po.dtype)
 
     @staticmethod
-    def _updated_deceased(comp, po, pa):
-        return int(
-            po.deceased[comp]
-            + (pa.i_d[comp] * po.infected[comp])
-            + (pa.h_d[comp] * po.hospitalized[comp])
-        )
+    def vaccination_transfers(params: np.ndarray) -> np.ndarray:
+        """
+        (..., 3, 3) matrix whose entry [j, k] is the rate at which sub-compartment j moves to sub-compartment k:
+        uv -> fv at rate vfv and fv -> b at rate vb.
+        """
+        transfers = np.zeros(params.shape[:-1] + (3, 3))
+        transfers[..., 0, 1] = params[..., p2i['vfv']]
+        transfers[..., 1, 2] = params[..., p2i['vb']]
+        return transfers
+
+    @staticmethod
+    def _vaccinated(updated, compartment, transfers):
+        # Every inflow and outflow has a single non-zero term, so they are the same products as the scalar equations.
+        inflow = np.einsum('...j,...jk->...k', compartment, transfers)
+        outflow = compartment * transfers.sum(axis=-1)
+        return updated + inflow - outflow
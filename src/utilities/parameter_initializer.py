@@ -2,6 +2,7 @@ import json
 import os
 from pathlib import Path
 
+import numpy as np
 import pandas as pd
 from lmfit import Parameters
 
@@ -9,12 +10,16 @@ from src.settings import data_directory
 
 
 class ParameterInitializer:
+    # Read-only epidemiological model arrays shared by every environment of the process (and by forked workers).
+    shared_epidemiological_model_arrays = {}
+
     def __init__(self, data_path, simulation_start_date=None):
         """This method initializes the required variables."""
 
         self.data_path = data_path
         self.simulation_start_date = simulation_start_date
         self.epidemiological_model_data = {}
+        self.initial_population_dynamics = {}
         self.states = self.initialize_state_names()
 
     def initialize_state_names(self):
@@ -390,6 +395,26 @@ class ParameterInitializer:
 
         return population_dynamics
 
+    def initialize_initial_population_dynamics(self, states, columns):
+        """This method initializes the population dynamics at the simulation start date as an array (states x
+        columns). The array is computed once per start date and cached, so resetting an environment does not scan the
+        epidemiological model data again.
+
+        :param states: List of the state names (rows of the array).
+        :param columns: List of the population dynamics columns (columns of the array)."""
+
+        key = (self.simulation_start_date, tuple(states), tuple(columns))
+        if key not in self.initial_population_dynamics:
+            population_dynamics = self.initialize_population_dynamics()
+            self.initial_population_dynamics[key] = np.array(
+                [
+                    population_dynamics[state][list(columns)].iloc[0].to_numpy(dtype=float)
+                    for state in states
+                ]
+            )
+
+        return self.initial_population_dynamics[key].copy()
+
     def initialize_state_populations(self):
         """This method initializes the state populations."""
 
@@ -404,34 +429,26 @@ class ParameterInitializer:
         return state_populations
 
     def initialize_action_dynamics(self, action_space):
-        """This method initializes the action dynamics."""
+        """This method initializes the action dynamics.
+
+        The action counters are returned as an integer array of shape (states x 5) whose columns count the
+        consecutive timesteps of no NPM/PM, SDM, lockdown, mask mandates and vaccination mandates. The allowed and
+        required actions (states x 5) and the allowed action numbers (states x actions) are arrays in the same order.
+        """
 
-        no_npm_pm_counters = {}
-        sdm_counters = {}
-        lockdown_counters = {}
-        mask_mandate_counters = {}
-        vaccination_mandate_counters = {}
         action_histories = {}
         previous_actions = {}
         current_actions = {}
-        allowed_actions = {}
-        required_actions = {}
-        allowed_actions_numbers = {}
 
         for state in self.states:
             action_histories[state] = []
             previous_actions[state] = 0
             current_actions[state] = 0
 
-            allowed_actions[state] = [True, True, True, True, True]
-            required_actions[state] = [False, False, False, False, False]
-            allowed_actions_numbers[state] = [1 for _ in range(action_space.n)]
-
-            no_npm_pm_counters[state] = 0
-            sdm_counters[state] = 0
-            lockdown_counters[state] = 0
-            mask_mandate_counters[state] = 0
-            vaccination_mandate_counters[state] = 0
+        allowed_actions = np.ones((len(self.states), 5), dtype=bool)
+        required_actions = np.zeros((len(self.states), 5), dtype=bool)
+        allowed_actions_numbers = np.ones((len(self.states), action_space.n), dtype=int)
+        action_counters = np.zeros((len(self.states), 5), dtype=int)
 
         return (
             action_histories,
@@ -440,12 +457,209 @@ class ParameterInitializer:
             allowed_actions,
             required_actions,
             allowed_actions_numbers,
-            no_npm_pm_counters,
-            sdm_counters,
-            lockdown_counters,
-            mask_mandate_counters,
-            vaccination_mandate_counters,
+            action_counters,
+        )
+
+    @staticmethod
+    def initialize_action_effects(action_effects_config=None):
+        """This method initializes the action effect table used by the epidemic simulation environment. Every entry
+        is an array indexed by the action number, so the effects of the actions of any number of states are looked up
+        with a single gather.
+
+        :param action_effects_config: Dictionary overriding entries of the table (e.g., to sweep the intervention
+                                      strengths). Overrides must have the same shape as the default entries.
+
+        :return action_effects: Dictionary containing:
+                                beta_multipliers - (12 x 2) multipliers of beta when the infected fraction of the
+                                                   population is at or above / below the infection threshold.
+                                economic_and_public_perception_multipliers - (12 x 2) multipliers of the economic and
+                                                   public perception rate, indexed like beta_multipliers.
+                                counter_increments - (12 x 5) booleans selecting the action counters (no NPM/PM, SDM,
+                                                   lockdown, mask mandate, vaccination mandate) that are incremented;
+                                                   the other counters are reset.
+                                percentages_unvaccinated_to_fully_vaccinated - (12) vaccination rates imposed by the
+                                                   action (NaN keeps the rate of the epidemiological model data).
+                                infection_threshold - Infected fraction of the population separating the columns of
+                                                   the multipliers."""
+
+        action_effects = {
+            # Action: (High infection, Low infection)
+            "beta_multipliers": [
+                [1.4, 1.1],  # 0: No NPM or PM taken.
+                [0.95, 0.95],  # 1: SDM
+                [0.85, 0.85],  # 2: Lockdown
+                [0.925, 0.925],  # 3: Public Mask Mandates
+                [0.95, 0.95],  # 4: Vaccination Mandates
+                [0.875, 0.875],  # 5: SDM and Public Mask Mandates
+                [0.825, 0.825],  # 6: SDM and Vaccination Mandates
+                [0.75, 0.75],  # 7: Lockdown and Public Mask Mandates
+                [0.80, 0.80],  # 8: Lockdown and Vaccination Mandates
+                [0.90, 0.90],  # 9: Public Mask Mandates and Vaccination Mandates
+                [0.60, 0.60],  # 10: SDM, Public Mask Mandates and Vaccination Mandates
+                [
+                    0.60,
+                    0.60,
+                ],  # 11: Lockdown, Public Mask Mandates and Vaccination Mandates
+            ],
+            "economic_and_public_perception_multipliers": [
+                [0.999, 1.005],
+                [0.9965, 0.9965],
+                [0.997, 0.997],
+                [0.9965, 0.9965],
+                [0.994, 0.994],
+                [0.9965, 0.9965],
+                [0.993, 0.993],
+                [0.994, 0.994],
+                [0.993, 0.993],
+                [0.9935, 0.9935],
+                [0.9925, 0.9925],
+                [0.9925, 0.9925],
+            ],
+            # No NPM/PM, SDM, Lockdown, Mask Mandate, Vaccination Mandate
+            "counter_increments": [
+                [True, False, False, False, False],
+                [False, True, False, False, False],
+                [False, False, True, False, False],
+                [False, False, False, True, False],
+                [False, False, False, False, True],
+                [False, True, False, True, False],
+                [False, True, False, False, True],
+                [False, False, True, True, False],
+                [False, False, True, False, True],
+                [False, False, False, True, True],
+                [False, True, False, True, True],
+                [False, False, True, True, True],
+            ],
+            "percentages_unvaccinated_to_fully_vaccinated": [
+                np.nan,
+                np.nan,
+                np.nan,
+                0.007084760245099044,
+                np.nan,
+                0.007084760245099044,
+                0.007084760245099044,
+                0.007084760245099044,
+                np.nan,
+                np.nan,
+                np.nan,
+                np.nan,
+            ],
+            "infection_threshold": 0.001,
+        }
+
+        for name, value in (action_effects_config or {}).items():
+            if name not in action_effects:
+                raise ValueError(f"Unknown action effect: {name}")
+            if np.shape(value) != np.shape(action_effects[name]):
+                raise ValueError(
+                    f"The action effect {name} must have the shape {np.shape(action_effects[name])}."
+                )
+            action_effects[name] = value
+
+        action_effects["beta_multipliers"] = np.array(
+            action_effects["beta_multipliers"], dtype=float
+        )
+        action_effects["economic_and_public_perception_multipliers"] = np.array(
+            action_effects["economic_and_public_perception_multipliers"], dtype=float
+        )
+        action_effects["counter_increments"] = np.array(
+            action_effects["counter_increments"], dtype=bool
         )
+        action_effects["percentages_unvaccinated_to_fully_vaccinated"] = np.array(
+            action_effects["percentages_unvaccinated_to_fully_vaccinated"], dtype=float
+        )
+
+        return action_effects
+
+    def initialize_shared_epidemiological_model_arrays(self, states, epidemiological_model_parameter_names):
+        """This method initializes the epidemiological model arrays (see initialize_epidemiological_model_arrays) of
+        the states. They are loaded once per process, made read-only and shared by every environment, so the noise of
+        an episode has to be applied outside of them.
+
+        :param states: List of the state names.
+        :param epidemiological_model_parameter_names: List of the model parameter names (excluding beta)."""
+
+        key = (
+            os.path.abspath(self.data_path),
+            data_directory,
+            tuple(states),
+            tuple(epidemiological_model_parameter_names),
+        )
+        if key not in self.shared_epidemiological_model_arrays:
+            epidemiological_model_arrays = self.initialize_epidemiological_model_arrays(
+                states=states,
+                state_populations=self.initialize_state_populations(),
+                epidemiological_model_data=self.epidemiological_model_data
+                or self.initialize_epidemiological_model_data(),
+                epidemiological_model_parameters=self.initialize_epidemiological_model_parameters(),
+                epidemiological_model_parameter_names=epidemiological_model_parameter_names,
+            )
+            for array in epidemiological_model_arrays.values():
+                array.setflags(write=False)
+            self.shared_epidemiological_model_arrays[key] = epidemiological_model_arrays
+
+        return self.shared_epidemiological_model_arrays[key]
+
+    @staticmethod
+    def initialize_epidemiological_model_arrays(
+            states,
+            state_populations,
+            epidemiological_model_data,
+            epidemiological_model_parameters,
+            epidemiological_model_parameter_names,
+    ):
+        """This method gathers the per-state model inputs into arrays (in the order of the given states) used by the
+        vectorized population dynamics.
+
+        :param states: List of the state names.
+        :param state_populations: Dictionary mapping the state names to their populations.
+        :param epidemiological_model_data: Dictionary mapping the state names to their epidemiological model data.
+        :param epidemiological_model_parameters: Dictionary mapping the state names to their model parameters.
+        :param epidemiological_model_parameter_names: List of the model parameter names (excluding beta).
+
+        :return epidemiological_model_arrays: Dictionary containing:
+                                state_populations - (states)
+                                beta - (states x splits)
+                                epidemiological_model_parameters - (states x parameters x splits)
+                                percentages_unvaccinated_to_fully_vaccinated - (states x days), NaN-padded.
+                                percentages_fully_vaccinated_to_booster_vaccinated - (states x days), NaN-padded."""
+
+        number_of_days = max(len(epidemiological_model_data[state]) for state in states)
+        epidemiological_model_arrays = {
+            "state_populations": np.array(
+                [state_populations[state] for state in states], dtype=float
+            ),
+            "beta": np.array(
+                [epidemiological_model_parameters[state]["beta"] for state in states],
+                dtype=float,
+            ),
+            "epidemiological_model_parameters": np.array(
+                [
+                    [
+                        epidemiological_model_parameters[state][parameter_name]
+                        for parameter_name in epidemiological_model_parameter_names
+                    ]
+                    for state in states
+                ],
+                dtype=float,
+            ),
+            "percentages_unvaccinated_to_fully_vaccinated": np.full(
+                (len(states), number_of_days), np.nan
+            ),
+            "percentages_fully_vaccinated_to_booster_vaccinated": np.full(
+                (len(states), number_of_days), np.nan
+            ),
+        }
+        for state_index, state in enumerate(states):
+            state_data = epidemiological_model_data[state]
+            epidemiological_model_arrays["percentages_unvaccinated_to_fully_vaccinated"][
+                state_index, : len(state_data)
+            ] = state_data["percentage_unvaccinated_to_fully_vaccinated"]
+            epidemiological_model_arrays["percentages_fully_vaccinated_to_booster_vaccinated"][
+                state_index, : len(state_data)
+            ] = state_data["percentage_fully_vaccinated_to_boosted"]
+
+        return epidemiological_model_arrays
 
     @staticmethod
     def initialize_initial_epidemiological_model_parameters(
@@ -0,0 +1,94 @@
+import logging
+import time
+from collections import defaultdict
+
+# Channel of the simulation telemetry. The events are logged at the DEBUG level.
+telemetry_logger = logging.getLogger("epidemic_simulation")
+
+
+class StepTelemetry:
+    """This class collects the telemetry of the environment steps: the time spent in each phase of a step and events
+    (e.g., the population dynamics after a step) that are passed to the registered callbacks and logged on the
+    "epidemic_simulation" logger. The instrumented code checks the enabled flag first, so disabled telemetry costs a
+    single attribute lookup per phase."""
+
+    def __init__(self, enabled=False):
+        """This method initializes the telemetry.
+
+        :param enabled: Boolean - Whether the phases are timed and the events are emitted."""
+
+        self.enabled = enabled
+        self.callbacks = []
+        self.phase_durations = defaultdict(float)
+        self.phase_calls = defaultdict(int)
+
+    def register_callback(self, callback):
+        """This method registers a callback and enables the telemetry.
+
+        :param callback: Function called as callback(event, fields) for every emitted event."""
+
+        self.callbacks.append(callback)
+        self.enabled = True
+
+    @staticmethod
+    def start():
+        """This method returns the start time of a phase."""
+
+        return time.perf_counter()
+
+    def lap(self, phase, start):
+        """This method records the duration of a phase and returns its end time, which is the start time of the next
+        phase.
+
+        :param phase: String - Name of the phase.
+        :param start: Float - Start time of the phase."""
+
+        end = time.perf_counter()
+        self.phase_durations[phase] += end - start
+        self.phase_calls[phase] += 1
+
+        return end
+
+    def emit(self, event, **fields):
+        """This method passes an event to the registered callbacks and logs it.
+
+        :param event: String - Name of the event.
+        :param fields: Values describing the event."""
+
+        for callback in self.callbacks:
+            callback(event, fields)
+        if telemetry_logger.isEnabledFor(logging.DEBUG):
+            telemetry_logger.debug("%s: %s", event, fields)
+
+    def report(self):
+        """This method returns the aggregated timings of the phases.
+
+        :returns report: - Dictionary mapping the phase names to their number of calls, total seconds and mean
+                           seconds."""
+
+        return {
+            phase: {
+                "calls": self.phase_calls[phase],
+                "total_seconds": duration,
+                "mean_seconds": duration / self.phase_calls[phase],
+            }
+            for phase, duration in self.phase_durations.items()
+        }
+
+    def format_report(self):
+        """This method formats the aggregated timings of the phases as a table."""
+
+        lines = [f"{'Phase':<20}{'Calls':>10}{'Total (s)':>14}{'Mean (us)':>14}"]
+        for phase, timings in self.report().items():
+            lines.append(
+                f"{phase:<20}{timings['calls']:>10}{timings['total_seconds']:>14.4f}"
+                f"{timings['mean_seconds'] * 1e6:>14.1f}"
+            )
+
+        return "\n".join(lines)
+
+    def reset_report(self):
+        """This method clears the aggregated timings."""
+
+        self.phase_durations.clear()
+        self.phase_calls.clear()
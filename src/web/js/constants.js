@@ -1,6 +1,13 @@
 consts = {
     websocket_url: "ws://localhost:8000/ws",
+    // 'binary' for the binary delta frames, 'json' for the full state on every step.
+    protocol: 'binary',
+    // Number of frames of a run that the server can send ahead of the frames drawn by the client.
+    stream_credits: 8,
+    max_run_steps: 365,
     step_interval: 1000,
+    // Maximum number of points of a chart, long runs are downsampled to fit.
+    chart_points: 512,
 }
 
 Actions = {
@@ -68,7 +75,7 @@ default_state = {
         max_steps: 365,
     },
     action_mask: [1, 1, 1, 1],
-    step_count: 0,
+    time_step: 0,
     is_done: false,
 }
 
@@ -0,0 +1,48 @@
+// Decodes the binary state frames of the websocket API (see seihrd/sim/frames.py).
+// The session message gives the layout of the values, and every frame updates the values that changed.
+
+const STATE_FRAME = 1
+const FRAME_HEADER_BYTES = 16
+
+class FrameDecoder {
+    constructor({layout, hyper_parameters}) {
+        this.paths = layout.ints.concat(layout.floats).map(path => path.split('.'))
+        this.intCount = layout.ints.length
+        this.state = {hyper_parameters: hyper_parameters}
+    }
+
+    decode(buffer) {
+        let view = new DataView(buffer)
+        if (view.getUint8(0) !== STATE_FRAME) {
+            console.log('Unknown frame type', view.getUint8(0))
+            return this.state
+        }
+        let isDone = view.getUint8(1)
+        let count = view.getUint16(2, true)
+        let timeStep = view.getUint32(4, true)
+        let masks = [view.getUint32(8, true), view.getUint32(12, true)]
+
+        let offset = FRAME_HEADER_BYTES
+        for (let i = 0; i < count; i++) {
+            if (((masks[i >> 5] >>> (i & 31)) & 1) === 0)
+                continue
+            let value = i < this.intCount ? view.getInt32(offset, true) : view.getFloat32(offset, true)
+            offset += 4
+            this.set(this.paths[i], value)
+        }
+
+        this.state.time_step = timeStep
+        this.state.is_done = isDone === 1
+        return this.state
+    }
+
+    set(path, value) {
+        let node = this.state
+        for (let i = 0; i < path.length - 1; i++) {
+            if (node[path[i]] === undefined)
+                node[path[i]] = isNaN(path[i + 1]) ? {} : []
+            node = node[path[i]]
+        }
+        node[path[path.length - 1]] = value
+    }
+}
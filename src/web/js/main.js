@@ -2,36 +2,103 @@ class Divoc {
     constructor() {
         this.state = default_state
         console.log('Trying to connect')
-        this.ws = new WebSocket(consts.websocket_url)
+        // Pages opened with ?room=name share the simulation of that room.
+        let params = new URLSearchParams({protocol: consts.protocol})
+        let room = new URLSearchParams(window.location.search).get('room')
+        if (room)
+            params.set('room', room)
+        this.ws = new WebSocket(consts.websocket_url + '?' + params)
+        this.ws.binaryType = 'arraybuffer'
+        this.decoder = null
+        this.running = false
+        // Only the driver of the room steps the simulation, the other pages watch its frames.
+        this.driver = false
         this.sim = new SimUI(this)
         this.stats = new Stats(this)
 
-        this.ws.onmessage = event => this.received(JSON.parse(event.data))
+        this.ws.onmessage = event => {
+            if (typeof event.data === 'string')
+                this.receivedMessage(JSON.parse(event.data))
+            else
+                this.received({state: this.decoder.decode(event.data)})
+        }
+    }
+
+    receivedMessage(message) {
+        if (message.type === 'session')
+            this.decoder = new FrameDecoder(message)
+        else if (message.type === 'room')
+            this.driver = message.driver
+        else if (message.type === 'run_end') {
+            this.running = false
+            if (message.error)
+                console.log(message.error)
+        }
+        else
+            this.received(message)
     }
 
-    received({state}) {
+    received({state, error}) {
+        if (error) {
+            console.log(error)
+            return
+        }
         this.state = state
         this.sim.draw()
         this.stats.step()
+
+        // Every frame that has been drawn gives the server a credit for the next one.
+        if (this.running)
+            this.send({type: 'credit', credits: 1})
     }
 
-    step() {
+    send(message) {
         if (this.ws?.readyState === WebSocket.OPEN){
-            this.ws.send(JSON.stringify({
-                type: 'step',
-                action: [0,0,1,0],
-                // prev_state: this.state,
-            }))
+            this.ws.send(JSON.stringify(message))
         }
         else {
             console.log('Not connected')
         }
     }
+
+    step() {
+        if (!this.driver || this.running || this.state.is_done)
+            return
+        this.send({
+            type: 'step',
+            action: [0,0,1,0],
+            // prev_state: this.state,
+        })
+    }
+
+    // Streams up to `steps` steps with the actions of the schedule (repeated) or of the named policy ('noop' or
+    // 'random'), at most `rate` frames per second.
+    run(steps, {actions = null, policy = 'noop', rate = null} = {}) {
+        if (!this.driver)
+            return
+        this.running = true
+        this.send({
+            type: 'run',
+            steps: steps,
+            actions: actions,
+            policy: policy,
+            rate: rate,
+            credits: consts.stream_credits,
+        })
+    }
+
+    stop() {
+        if (this.driver)
+            this.send({type: 'stop'})
+    }
 }
 
 
 $(document).ready(function () {
     let env = new Divoc()
     setInterval(() => env.step(), consts.step_interval);
+    // The run ends with the episode.
+    $('#startBtn').click(() => env.run(consts.max_run_steps))
+    $('#pauseBtn').click(() => env.stop())
 });
 
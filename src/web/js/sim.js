@@ -13,35 +13,56 @@ class SimUI {
         this.canvas.height = this.dim.h
 
         paper.setup(canvas)
+        this.build()
         this.draw()
     }
 
-    draw() {
-        paper.project.clear()
+    // The items are created once, and every frame only updates the texts of the compartments. Paper redraws the
+    // changed items once per animation frame.
+    build() {
         let d = this.dim
-        let s = this.divoc.state
-
         let ch = d.h / 2
         let u = d.u
 
-        this.compartment(u * 7, ch, s.populations.susceptible, 'Susceptible')
-        this.compartment(u * 15, ch + (u * 5), s.populations.exposed, 'exposed')
-        this.compartment(u * 15, ch - (u * 5), s.populations.exposed, 'exposed')
-        this.compartment(u * 23, ch, s.populations.infected, 'infected')
-        this.compartment(u * 36, ch - (u * 5), s.populations.recovered, 'recovered')
-        this.compartment(u * 36, ch, s.populations.hospitalized, 'hospitalized')
-        this.compartment(u * 36, ch + (u * 5), s.populations.deceased, 'deceased')
+        this.compartments = [
+            this.compartment(u * 7, ch, 'susceptible', 'Susceptible'),
+            this.compartment(u * 15, ch + (u * 5), 'exposed', 'exposed'),
+            this.compartment(u * 15, ch - (u * 5), 'exposed', 'exposed'),
+            this.compartment(u * 23, ch, 'infected', 'infected'),
+            this.compartment(u * 36, ch - (u * 5), 'recovered', 'recovered'),
+            this.compartment(u * 36, ch, 'hospitalized', 'hospitalized'),
+            this.compartment(u * 36, ch + (u * 5), 'deceased', 'deceased'),
+        ]
+    }
+
+    draw() {
+        let s = this.divoc.state
+        this.compartments.forEach(c => {
+            let population = s.populations[c.key]
+            c.total.content = c.name + ': ' + (population.uv + population.fv + population.b)
+            c.uv.content = 'uv: ' + population.uv
+            c.fv.content = 'fv: ' + population.fv
+            c.b.content = 'b: ' + population.b
+        })
     }
 
     // ----------------------------------------
 
-    compartment(cx, cy, population, name){
+    compartment(cx, cy, key, name){
         let u = this.dim.u
         let w = 9
-        this.rect(cx, cy, u, u * w, 'black', name + ': ' + (population.uv + population.fv + population.b))
-        this.rect(cx - (u * w/3), cy + u, u, u * w/3, 'black', 'uv: ' + population.uv)
-        this.rect(cx, cy + u, u, u * w/3, 'black', 'fv: ' + population.fv)
-        this.rect(cx + (u * w/3), cy + u, u, u * w/3, 'black', 'b: ' + population.b)
+        this.rect(cx, cy, u, u * w)
+        this.rect(cx - (u * w/3), cy + u, u, u * w/3)
+        this.rect(cx, cy + u, u, u * w/3)
+        this.rect(cx + (u * w/3), cy + u, u, u * w/3)
+        return {
+            key: key,
+            name: name,
+            total: this.text(cx, cy, ''),
+            uv: this.text(cx - (u * w/3), cy + u, ''),
+            fv: this.text(cx, cy + u, ''),
+            b: this.text(cx + (u * w/3), cy + u, ''),
+        }
     }
 
     circle(cx, cy, r, strokeColor='black', fillColor=null) {
@@ -57,6 +78,7 @@ class SimUI {
         rect.strokeColor = strokeColor
         if (text != null)
             this.text(cx, cy, text)
+        return rect
     }
 
     text(cx, cy, content, fillColor='black') {
@@ -64,5 +86,6 @@ class SimUI {
         text.justification = 'center'
         text.fillColor = fillColor
         text.content = content
+        return text
     }
 }
\ No newline at end of file
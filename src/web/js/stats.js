@@ -1,7 +1,37 @@
+// The points of a chart, at most `size` of them. When the window is full every other point is dropped, and from then
+// on only every `stride`-th step is added, so a long run is shown whole with a bounded number of points.
+class ChartWindow {
+    constructor(chart, size) {
+        this.chart = chart
+        this.size = size
+        this.stride = 1
+        this.steps = 0
+    }
+
+    push(label, values) {
+        if (this.steps++ % this.stride !== 0)
+            return
+        let data = this.chart.data
+        if (data.labels.length >= this.size) {
+            let even = (_, index) => index % 2 === 0
+            data.labels = data.labels.filter(even)
+            data.datasets.forEach(dataset => dataset.data = dataset.data.filter(even))
+            this.stride *= 2
+            if ((this.steps - 1) % this.stride !== 0)
+                return
+        }
+        data.labels.push(label)
+        values.forEach((value, index) => data.datasets[index].data.push(value))
+    }
+}
+
 class Stats {
     constructor(env) {
         this.env = env
         this.setupCharts()
+        this.windows = [this.populationChart, this.subCompPopulationChart, this.eppChart].map(
+            chart => new ChartWindow(chart, consts.chart_points))
+        this.pending = false
     }
 
     setupCharts() {
@@ -257,11 +287,20 @@ class Stats {
         // })
     }
     
+    // Adds the current state to the charts. The charts are redrawn once per animation frame, however fast the frames
+    // arrive.
     step() {
         this.updatePopulationChart()
         this.updateSubCompPopChart()
         this.updateEppChart()
         // this.updateProbsChart()
+        if (!this.pending) {
+            this.pending = true
+            requestAnimationFrame(() => {
+                this.pending = false
+                this.windows.forEach(window => window.chart.update(0))
+            })
+        }
     }
 
     updatePopulationChart() {
@@ -274,13 +313,11 @@ class Stats {
             'hospitalized',
             'deceased',
         ]
-        compartments.forEach((comp, index) => {
+        let totals = compartments.map(comp => {
             let population = this.env.state.populations[comp]
-            let total = population.uv + population.fv + population.b
-            this.populationChart.data.datasets[index].data.push(total)
+            return population.uv + population.fv + population.b
         })
-        this.populationChart.data.labels.push(this.env.state.step_count)
-        this.populationChart.update(this.env.state.step_count)
+        this.windows[0].push(this.env.state.time_step, totals)
     }
 
     updateSubCompPopChart() {
@@ -302,17 +339,11 @@ class Stats {
             fv += population.fv
             b += population.b
         })
-        this.subCompPopulationChart.data.datasets[0].data.push(uv)
-        this.subCompPopulationChart.data.datasets[1].data.push(fv)
-        this.subCompPopulationChart.data.datasets[2].data.push(b)
-        this.subCompPopulationChart.data.labels.push(this.env.state.step_count);
-        this.subCompPopulationChart.update(this.env.state.step_count)
+        this.windows[1].push(this.env.state.time_step, [uv, fv, b])
     }
 
     updateEppChart() {
-        this.eppChart.data.datasets[0].data.push(this.env.state.epp)
-        this.eppChart.data.labels.push(this.env.state.step_count)
-        this.eppChart.update(this.env.state.step_count)
+        this.windows[2].push(this.env.state.time_step, [this.env.state.epp])
     }
 
     updateProbsChart(){
@@ -334,8 +365,8 @@ class Stats {
         probs.forEach((prob, index) => {
             this.probsChart.data.datasets[index].data.push(this.env.state.probs[prob])
         })
-        this.probsChart.data.labels.push(this.env.state.step_count)
-        this.probsChart.update(this.env.state.step_count)
+        this.probsChart.data.labels.push(this.env.state.time_step)
+        this.probsChart.update(this.env.state.time_step)
     }
 
     addChartToPage(chartConfig) {